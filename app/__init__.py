@@ -1,11 +1,27 @@
-from flask import Flask
+from flask import Flask, g
 from flask_login import LoginManager
+from flask_caching import Cache
 from config import Config
+import click
+import importlib
 import os
 
-login_manager = LoginManager()
-login_manager.login_view = 'auth.login'
-login_manager.login_message = 'Please log in to access this page.'
+cache = Cache()
+
+# (name, 'module.attribute', url_prefix) - modules are only imported when
+# the blueprint is enabled, see ENABLED_BLUEPRINTS in config.
+BLUEPRINTS = (
+    ('main', 'app.routes.main_bp', None),
+    ('auth', 'app.auth.auth_bp', '/auth'),
+    ('admin', 'app.admin.admin_bp', '/admin'),
+)
+
+
+def _register_blueprint(app, path, url_prefix=None):
+    """Import a blueprint by dotted path and register it on the app"""
+    mod_name, attr = path.rsplit('.', 1)
+    module = importlib.import_module(mod_name)
+    app.register_blueprint(getattr(module, attr), url_prefix=url_prefix)
 
 
 def create_app(config_class=Config):
@@ -17,37 +33,69 @@ def create_app(config_class=Config):
     from app.models import db
     db.init_app(app)
 
+    # One LoginManager per app, so loaders don't accumulate on a global
+    # instance across create_app() calls
+    login_manager = LoginManager()
+    login_manager.login_view = 'auth.login'
+    login_manager.login_message = 'Please log in to access this page.'
     login_manager.init_app(app)
+    app.extensions['login_manager'] = login_manager
+    cache.init_app(app)
 
     @login_manager.user_loader
     def load_user(user_id):
+        # Flask-Login may call this several times per request; only the
+        # first lookup for a given id hits the database.
         from app.models import User
-        return User.query.get(int(user_id))
+        uid = int(user_id)
+        users = g.setdefault('_user_cache', {})
+        user = users.get(uid)
+        if user is None:
+            user = db.session.get(User, uid)
+            users[uid] = user
+        return user
 
-    with app.app_context():
-        db.create_all()
+    @app.teardown_request
+    def clear_user_cache(exc):
+        g.pop('_user_cache', None)
+
+    if app.config.get('AUTO_CREATE_TABLES'):
+        with app.app_context():
+            db.create_all()
 
-        # Create default admin only if ADMIN_PASSWORD is set
+    @app.cli.command('init-db')
+    def init_db():
+        """Create tables and the default admin account."""
         from app.models import User
+        db.create_all()
+
+        # Create default admin only if ADMIN_PASSWORD is set. A single
+        # INSERT ... ON CONFLICT DO NOTHING, so concurrent runs can't race.
         admin_password = os.environ.get('ADMIN_PASSWORD')
-        admin = User.query.filter_by(email='admin').first()
-        if not admin and admin_password:
-            admin = User(
-                email='admin',
-                name='Administrator',
-                role='admin',
-                is_active=True
-            )
+        if admin_password:
+            if db.engine.dialect.name == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            admin = User(email='admin')
             admin.set_password(admin_password)
-            db.session.add(admin)
+            result = db.session.execute(
+                insert(User).values(
+                    email=admin.email,
+                    password_hash=admin.password_hash,
+                    name='Administrator',
+                    role='admin',
+                    is_active=True
+                ).on_conflict_do_nothing(index_elements=['email'])
+            )
             db.session.commit()
+            if result.rowcount:
+                click.echo('Created default admin user.')
+        click.echo('Database initialized.')
 
-    from app.routes import main_bp
-    from app.auth import auth_bp
-    from app.admin import admin_bp
-
-    app.register_blueprint(main_bp)
-    app.register_blueprint(auth_bp, url_prefix='/auth')
-    app.register_blueprint(admin_bp, url_prefix='/admin')
+    enabled = app.config.get('ENABLED_BLUEPRINTS')
+    for name, path, url_prefix in BLUEPRINTS:
+        if enabled is None or name in enabled:
+            _register_blueprint(app, path, url_prefix)
 
     return app
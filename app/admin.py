@@ -1,9 +1,12 @@
 """
 Admin dashboard for RCBilling SaaS
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, session
 from flask_login import login_required, current_user
-from app.models import db, User, SubmissionLog
+from sqlalchemy import select, func, delete
+from sqlalchemy.orm import selectinload
+from app import cache
+from app.models import db, User, Provider, SubmissionLog
 from datetime import datetime, timedelta
 from functools import wraps
 
@@ -22,20 +25,54 @@ def admin_required(f):
     return decorated_function
 
 
+def _dashboard_cache_key():
+    # The generation is bumped by every admin mutation, orphaning old entries
+    return f"admin-dash:{cache.get('admin-dash-gen') or 0}:{current_user.id}"
+
+
+def _invalidate_dashboard():
+    # No expiry: a generation that timed out would restart at 0 and could
+    # land on a page cached before this mutation
+    cache.set('admin-dash-gen', (cache.get('admin-dash-gen') or 0) + 1, timeout=0)
+
+
 @admin_bp.route('/')
 @admin_required
+@cache.cached(timeout=20, key_prefix=_dashboard_cache_key,
+              unless=lambda: bool(session.get('_flashes')))
 def dashboard():
     """Admin dashboard - overview of all clinics"""
-    clinics = User.query.filter_by(role='clinic').order_by(User.created_at.desc()).all()
-
-    # Get recent submissions
-    recent_logs = SubmissionLog.query.order_by(SubmissionLog.timestamp.desc()).limit(20).all()
-
-    # Stats
+    # Only the columns the clinic table renders, as plain rows (no ORM
+    # instances, no password hashes). Labels match the template's names.
+    clinics = db.session.execute(
+        select(
+            User.id,
+            User.email,
+            User.name.label('clinic_name'),
+            User.is_subscription_active.label('is_subscription_active'),
+            User.created_at
+        ).where(User.role == 'clinic').order_by(User.created_at.desc())
+    ).all()
+
+    # Get recent submissions (load each log's user up front - the template
+    # reads log.user for every row)
+    recent_logs = db.session.scalars(
+        select(SubmissionLog).options(selectinload(SubmissionLog.user))
+        .order_by(SubmissionLog.timestamp.desc()).limit(20)
+    ).all()
+
+    # Stats - both sums and the active clinic count in one round trip
     total_clinics = len(clinics)
-    active_clinics = sum(1 for c in clinics if c.is_subscription_active)
-    total_submissions = db.session.query(db.func.sum(SubmissionLog.total_records)).scalar() or 0
-    total_services = db.session.query(db.func.sum(SubmissionLog.total_services)).scalar() or 0
+    active_count = select(func.count()).select_from(User).where(
+        User.role == 'clinic', User.is_subscription_active
+    ).scalar_subquery()
+    total_submissions, total_services, active_clinics = db.session.execute(
+        select(
+            func.coalesce(func.sum(SubmissionLog.total_records), 0),
+            func.coalesce(func.sum(SubmissionLog.total_services), 0),
+            active_count
+        )
+    ).one()
 
     return render_template('admin/dashboard.html',
                            clinics=clinics,
@@ -58,7 +95,7 @@ def add_clinic():
         provider_name = request.form.get('provider_name', '')
 
         # Validate
-        if User.query.filter_by(email=email).first():
+        if db.session.scalar(select(User.id).where(User.email == email)):
             flash('Email already registered.', 'error')
             return render_template('admin/add_clinic.html', regional_centers=['ELARC', 'SGPRC'])
 
@@ -77,6 +114,7 @@ def add_clinic():
 
         db.session.add(clinic)
         db.session.commit()
+        _invalidate_dashboard()
 
         flash(f'Clinic "{clinic_name}" created successfully!', 'success')
         return redirect(url_for('admin.dashboard'))
@@ -88,8 +126,11 @@ def add_clinic():
 @admin_required
 def view_clinic(clinic_id):
     """View clinic details"""
-    clinic = User.query.get_or_404(clinic_id)
-    submissions = SubmissionLog.query.filter_by(user_id=clinic_id).order_by(SubmissionLog.timestamp.desc()).limit(50).all()
+    clinic = db.get_or_404(User, clinic_id)
+    submissions = db.session.scalars(
+        select(SubmissionLog).where(SubmissionLog.user_id == clinic_id)
+        .order_by(SubmissionLog.timestamp.desc()).limit(50)
+    ).all()
 
     return render_template('admin/view_clinic.html', clinic=clinic, submissions=submissions)
 
@@ -98,9 +139,10 @@ def view_clinic(clinic_id):
 @admin_required
 def toggle_clinic(clinic_id):
     """Enable/disable clinic subscription"""
-    clinic = User.query.get_or_404(clinic_id)
+    clinic = db.get_or_404(User, clinic_id)
     clinic.is_active = not clinic.is_active
     db.session.commit()
+    _invalidate_dashboard()
 
     status = 'activated' if clinic.is_active else 'deactivated'
     flash(f'Clinic "{clinic.clinic_name}" has been {status}.', 'success')
@@ -111,7 +153,7 @@ def toggle_clinic(clinic_id):
 @admin_required
 def extend_subscription(clinic_id):
     """Extend clinic subscription"""
-    clinic = User.query.get_or_404(clinic_id)
+    clinic = db.get_or_404(User, clinic_id)
     days = int(request.form.get('days', 30))
 
     if clinic.subscription_end and clinic.subscription_end > datetime.utcnow():
@@ -123,6 +165,7 @@ def extend_subscription(clinic_id):
 
     clinic.is_active = True
     db.session.commit()
+    _invalidate_dashboard()
 
     flash(f'Subscription extended by {days} days.', 'success')
     return redirect(url_for('admin.view_clinic', clinic_id=clinic_id))
@@ -132,14 +175,15 @@ def extend_subscription(clinic_id):
 @admin_required
 def delete_clinic(clinic_id):
     """Delete a clinic (soft delete - just deactivate)"""
-    clinic = User.query.get_or_404(clinic_id)
-
-    # Delete submission logs first
-    SubmissionLog.query.filter_by(user_id=clinic_id).delete()
+    clinic = db.get_or_404(User, clinic_id)
+    clinic_name = clinic.name
 
-    # Delete clinic
-    db.session.delete(clinic)
+    # One DELETE per table instead of loading and deleting row by row
+    db.session.execute(delete(SubmissionLog).where(SubmissionLog.user_id == clinic_id))
+    db.session.execute(delete(Provider).where(Provider.user_id == clinic_id))
+    db.session.execute(delete(User).where(User.id == clinic_id))
     db.session.commit()
+    _invalidate_dashboard()
 
-    flash(f'Clinic "{clinic.clinic_name}" has been deleted.', 'success')
+    flash(f'Clinic "{clinic_name}" has been deleted.', 'success')
     return redirect(url_for('admin.dashboard'))
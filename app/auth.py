@@ -4,10 +4,14 @@ Authentication and settings routes
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
 from app.models import db, User, Provider, REGIONAL_CENTERS
-from datetime import datetime
+from sqlalchemy import select, func, update
+from datetime import datetime, timedelta
 
 auth_bp = Blueprint('auth', __name__)
 
+# last_login is informational; don't write it on every login
+LAST_LOGIN_THROTTLE = timedelta(minutes=5)
+
 
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
@@ -18,9 +22,12 @@ def login():
         username = request.form.get('email', '').strip()
         password = request.form.get('password', '')
 
-        user = User.query.filter_by(email=username.lower()).first()
-        if not user:
-            user = User.query.filter(User.email.ilike(username)).first()
+        # Older databases may hold emails differing only in case; take the
+        # oldest account rather than failing on the duplicate
+        user = db.session.execute(
+            select(User).where(func.lower(User.email) == username.lower())
+            .order_by(User.id).limit(1)
+        ).scalars().first()
 
         if user and user.check_password(password):
             if not user.is_active:
@@ -28,8 +35,13 @@ def login():
                 return render_template('auth/login.html')
 
             login_user(user, remember=True)
-            user.last_login = datetime.utcnow()
-            db.session.commit()
+            now = datetime.utcnow()
+            if user.last_login is None or now - user.last_login > LAST_LOGIN_THROTTLE:
+                db.session.execute(
+                    update(User).where(User.id == user.id).values(last_login=now)
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
 
             return redirect(request.args.get('next') or url_for('main.index'))
         else:
@@ -50,7 +62,7 @@ def logout():
 @login_required
 def settings():
     return render_template('auth/settings.html',
-                           providers=current_user.providers.all(),
+                           providers=current_user.providers,
                            regional_centers=REGIONAL_CENTERS)
 
 
@@ -91,7 +103,7 @@ def add_provider():
 @login_required
 def update_provider(provider_id):
     """Update provider credentials"""
-    provider = Provider.query.get_or_404(provider_id)
+    provider = db.get_or_404(Provider, provider_id)
     if provider.user_id != current_user.id:
         flash('Access denied', 'error')
         return redirect(url_for('auth.settings'))
@@ -101,15 +113,26 @@ def update_provider(provider_id):
     username = request.form.get('username', '').strip()
     password = request.form.get('password', '').strip()
 
-    if name:
-        provider.name = name
-    if regional_center and regional_center in REGIONAL_CENTERS:
-        provider.regional_center = regional_center
-
-    if username and password:
+    changes = {}
+    if name and name != provider.name:
+        changes['name'] = name
+    if (regional_center and regional_center in REGIONAL_CENTERS
+            and regional_center != provider.regional_center):
+        changes['regional_center'] = regional_center
+
+    if username and password and (username, password) != provider.get_credentials():
+        # Credentials changed - re-encrypt through the model
+        for field, value in changes.items():
+            setattr(provider, field, value)
         provider.set_credentials(username, password)
-
-    db.session.commit()
+        db.session.commit()
+    elif changes:
+        # Only plain columns changed - one UPDATE, no encryption round
+        changes['updated_at'] = datetime.utcnow()
+        db.session.execute(
+            update(Provider).where(Provider.id == provider.id).values(**changes)
+        )
+        db.session.commit()
     flash(f'Provider updated', 'success')
     return redirect(url_for('auth.settings'))
 
@@ -118,7 +141,7 @@ def update_provider(provider_id):
 @login_required
 def delete_provider(provider_id):
     """Delete a provider"""
-    provider = Provider.query.get_or_404(provider_id)
+    provider = db.get_or_404(Provider, provider_id)
     if provider.user_id != current_user.id:
         flash('Access denied', 'error')
         return redirect(url_for('auth.settings'))
@@ -17,10 +17,19 @@ Portal Flow:
 10. Click Update to save
 """
 from playwright.sync_api import sync_playwright, Page, Browser
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Tuple
-from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+import hashlib
+import json
 import logging
+import queue
+import re
+import threading
 import time
 import os
 import urllib3
@@ -35,6 +44,49 @@ PLAYWRIGHT_HEADLESS = os.environ.get('PLAYWRIGHT_HEADLESS', 'true').lower() == '
 # Create screenshots directory for debugging
 SCREENSHOT_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'screenshots')
 os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+# Debug screenshots: 'on' / 'off', or unset to take them only in headed
+# (local debugging) runs - headless production runs skip them
+SCREENSHOTS_SETTING = os.environ.get('PLAYWRIGHT_SCREENSHOTS', '').lower()
+# When screenshots are on, keep every Nth shot of each per-record step
+# (the first always); error_* shots are never skipped
+SCREENSHOT_EVERY = max(1, int(os.environ.get('PLAYWRIGHT_SCREENSHOT_EVERY', 1)))
+
+# Resource types the bot never needs; aborted before download. Comma
+# separated, empty to load everything (e.g. when watching a headed run).
+# Stylesheets stay loaded - the Dojo grids depend on them for layout.
+BLOCKED_RESOURCE_TYPES = frozenset(
+    t.strip() for t in os.environ.get('PLAYWRIGHT_BLOCK_RESOURCES', 'image,font,media').split(',')
+    if t.strip()
+)
+
+# Default number of parallel bot sessions for DDSeBillingPool
+PLAYWRIGHT_WORKERS = int(os.environ.get('PLAYWRIGHT_WORKERS', 2))
+
+# Multi-consumer invoices whose consumer lines a bot keeps in memory; the
+# least recently used invoice is dropped beyond this
+MULTI_CONSUMER_CACHE_SIZE = 512
+
+# Opt-in: keep the portal session (cookies + storage) between bot runs so
+# the next run for the same login can skip the login flow. Sessions are
+# saved per portal URL + username and are not logged out on stop().
+REUSE_PORTAL_SESSION = os.environ.get('PLAYWRIGHT_REUSE_SESSION', 'false').lower() == 'true'
+SESSION_STATE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'browser_state')
+
+# Per portal URL, which alternative of each multi-selector click matched
+# last time (see _js_click_any); it is tried first on later runs
+SELECTOR_PROFILE_PATH = os.path.join(SESSION_STATE_DIR, 'selectors.json')
+_SELECTOR_PROFILE_LOCK = threading.Lock()  # Pool workers share the file
+
+# A provider's scraped invoice inventory is reused by runs starting within
+# this many seconds (e.g. a retry after fixing a CSV row); 0 disables
+INVENTORY_CACHE_TTL = int(os.environ.get('PLAYWRIGHT_INVENTORY_TTL', 300))
+INVENTORY_CACHE_DIR = os.path.join(SESSION_STATE_DIR, 'inventory')
+
+# Successful submissions of the run in progress, one JSON line each, so a
+# run that dies part-way resumes without reopening finished records; the
+# file is removed once a run gets through all its invoices
+CHECKPOINT_DIR = os.path.join(SESSION_STATE_DIR, 'checkpoints')
+_CHECKPOINT_LOCK = threading.Lock()  # Pool sessions append to the same file
 
 # Portal URLs by Regional Center
 RC_PORTAL_URLS = {
@@ -42,8 +94,50 @@ RC_PORTAL_URLS = {
     'ELARC': 'https://ebilling.dds.ca.gov:8373/login',
 }
 
-
-@dataclass
+# Login page controls. Each is one CSS union, so Playwright resolves all
+# alternatives in a single auto-wait rather than one timeout per selector.
+LAUNCH_BUTTON_SELECTOR = ', '.join([
+    '#launch-box img[onclick]:visible',
+    'img[onclick*="launch"]:visible',
+    '[onclick*="launch" i]:visible',
+    'input[value*="LAUNCH" i]:visible',
+    'a:has-text("LAUNCH APPLICATION"):visible',
+    'button:has-text("LAUNCH"):visible',
+    '.btn:has-text("Launch"):visible',
+])
+USERNAME_INPUT_SELECTOR = ', '.join([
+    'input[type="text"]',
+    'input[name="username"]',
+    'input[name="userName"]',
+    'input[name="user"]',
+    'input[id="username"]',
+    'input[id="userName"]',
+])
+LOGIN_BUTTON_SELECTOR = ', '.join([
+    'input[type="submit"][value="Login"]',
+    'input[value="Login"]',
+    'button:has-text("Login")',
+    'input[type="submit"]',
+])
+
+# Pages the portal can show right after login (regex source, matched
+# against document.body.innerText)
+POST_LOGIN_TEXT = 'Service Provider Selection|I do not agree|User Profile of|password will expire'
+
+# Page-ready predicates for _wait_ready() (JS expressions)
+PROVIDER_SELECTION_JS = "document.body.innerText.includes('Service Provider Selection')"
+INVOICES_TAB_JS = "Array.from(document.getElementsByTagName('a')).some(a => a.innerText.includes('Invoices'))"
+# Invoice view: a consumer line, i.e. a small Line# in one of a row's first cells
+INVOICE_VIEW_JS = ("Array.from(document.getElementsByTagName('tr')).some(tr => tr.cells.length >= 6 && "
+                   "Array.from(tr.cells).slice(0, 3).some(td => /^\\d{1,3}$/.test(td.textContent.trim())))")
+CALENDAR_JS = "document.querySelector('td input[type=\"text\"]') !== null"
+
+# Installed in every page of the browser context (see start()); exposes
+# window.__dds.* helpers that the bot calls with page.evaluate
+PAGE_HELPERS_JS_PATH = os.path.join(os.path.dirname(__file__), 'dds_helpers.js')
+
+
+@dataclass(slots=True)
 class SubmissionResult:
     """Result of a billing submission"""
     success: bool
@@ -53,8 +147,8 @@ class SubmissionResult:
     invoice_id: str = ""  # Invoice number from portal
     days_entered: int = 0
     days_expected: int = 0  # Total days expected from CSV
-    unavailable_days: List[int] = None  # Days that were greyed out/disabled
-    already_entered_days: List[int] = None  # Days that already had values (skipped)
+    unavailable_days: List[int] = field(default_factory=list)  # Days that were greyed out/disabled
+    already_entered_days: List[int] = field(default_factory=list)  # Days that already had values (skipped)
     error_message: Optional[str] = None
     # Billing data from RC portal (captured after update)
     rc_units_billed: float = 0.0
@@ -64,6 +158,40 @@ class SubmissionResult:
     # Billing data from CSV invoice
     invoice_units: float = 0.0
     invoice_amount: float = 0.0
+    # Left alone because the portal line already shows the CSV's units;
+    # note says why (not an error)
+    skipped: bool = False
+    note: str = ""
+
+
+def _invoice_totals(record: Dict) -> Tuple[float, float]:
+    """CSV (units, amount) for a record, parsed once and kept on the record"""
+    if '_invoice_units' not in record:
+        record['_invoice_units'] = float(record.get('entered_units', 0) or 0)
+        record['_invoice_amount'] = float(record.get('entered_amount', 0) or 0)
+    return record['_invoice_units'], record['_invoice_amount']
+
+
+def _checkpoint_key(record: Dict) -> str:
+    """Identifies a record's exact submission; editing the CSV row changes it"""
+    days = ','.join(str(day) for day in sorted(record.get('service_days', [])))
+    return '|'.join([record.get('uci', ''), record.get('svc_code', ''), record.get('svc_subcode', ''),
+                     str(record.get('auth_number', '') or ''), record.get('service_month', ''),
+                     days, f"{_invoice_totals(record)[0]:g}"])
+
+
+def _fail_result(record: Dict, error_message: str, **fields) -> SubmissionResult:
+    """Failed SubmissionResult for a CSV record; fields override the ones taken from it"""
+    invoice_units, invoice_amount = _invoice_totals(record)
+    values = dict(
+        consumer_name=record.get('consumer_name', ''),
+        uci=record.get('uci', ''),
+        days_expected=len(record.get('service_days', [])),
+        invoice_units=invoice_units,
+        invoice_amount=invoice_amount,
+    )
+    values.update(fields)
+    return SubmissionResult(success=False, error_message=error_message, **values)
 
 
 @dataclass
@@ -109,7 +237,8 @@ class DDSeBillingBot:
     """
 
     def __init__(self, username: str, password: str, headless: bool = None,
-                 regional_center: str = 'ELARC', portal_url: str = None):
+                 regional_center: str = 'ELARC', portal_url: str = None,
+                 screenshot_dir: str = None, reuse_session: bool = True):
         self.username = username
         self.password = password
         # Use provided value, or fall back to environment setting
@@ -128,10 +257,37 @@ class DDSeBillingBot:
 
         self.password_expiry_days = None  # Populated if portal shows expiry warning
 
+        # Saved session for this portal + login (see REUSE_PORTAL_SESSION).
+        # reuse_session=False keeps a bot off it: bots running side by side
+        # on one saved session would share one portal session (selected
+        # provider, open invoice) and overwrite each other's state file
+        self._state_path: Optional[str] = None
+        if REUSE_PORTAL_SESSION and reuse_session:
+            key = hashlib.sha256(f"{self.portal_url}|{username}".encode()).hexdigest()[:16]
+            self._state_path = os.path.join(SESSION_STATE_DIR, f"{key}.json")
+        self._logged_in = False
+        self._selector_profile: Dict[str, str] = self._load_selector_profile()
+
         # Invoice caching for efficient multi-record processing
         self._invoice_search_cache: List[Dict] = []  # Level 1: Search results
-        self._multi_consumer_cache: Dict = {}  # Level 2: Contents inside multi-consumer invoices (keyed by invoice_id or (svc_code, month) tuple)
+        self._search_page = 1  # Search results page scrape_all_invoice_pages() left open
+        self._checkpoint_path: Optional[str] = None  # See CHECKPOINT_DIR, set by _prepare_submission()
+        self._invoice_index: Dict[tuple, Dict] = {}  # (svc_code, MM/YYYY) -> first search result, see _set_inventory()
+        self._multi_consumer_cache: OrderedDict = OrderedDict()  # Level 2: Contents inside multi-consumer invoices, LRU keyed by _invoice_cache_key()
+        self._invoice_aliases: Dict[str, str] = {}  # 'svc_code|MM/YYYY' -> invoice_id, so both keys reach one cache entry
         self._current_invoice_key: Optional[tuple] = None  # Track currently open invoice (svc_code, svc_month_year)
+        self._open_invoice_id: Optional[str] = None  # Invoice last opened by invoice_id, until we go back to the search
+        self._provider_cache: Optional[List[Dict]] = None  # Provider grid, fixed for the login session
+        self._row_cache_key: Optional[str] = None  # DOM version the row snapshot was taken at
+        self._row_cache: List[Dict] = []  # See _snapshot_rows()
+        self._calendar_days: Optional[List[int]] = None  # Day inputs stamped on the open calendar, see _index_calendar()
+
+        # Screenshots are captured on the bot thread but written to disk by
+        # a background writer, so file I/O stays off the automation path
+        self.screenshot_dir = screenshot_dir or SCREENSHOT_DIR
+        self._shot_queue: Optional[queue.Queue] = None
+        self._shot_writer: Optional[threading.Thread] = None
+        self._shot_counts: Dict[str, int] = defaultdict(int)  # Calls per screenshot name, for SCREENSHOT_EVERY
 
     def __enter__(self):
         self.start()
@@ -148,22 +304,82 @@ class DDSeBillingBot:
         self.browser = self.playwright.firefox.launch(
             headless=self.headless,
         )
-        self.context = self.browser.new_context()
+        storage_state = None
+        if self._state_path and os.path.exists(self._state_path):
+            storage_state = self._state_path
+        self.context = self.browser.new_context(storage_state=storage_state)
+        # Applies to the launch popup and any later pages as well
+        self.context.add_init_script(path=PAGE_HELPERS_JS_PATH)
+        if BLOCKED_RESOURCE_TYPES:
+            self.context.route("**/*", self._filter_resources)
         self.page = self.context.new_page()
+        self._watch_navigation(self.page)
         self.page.set_viewport_size({"width": 1400, "height": 900})
+        if SCREENSHOTS_SETTING == 'on' or (SCREENSHOTS_SETTING != 'off' and not self.headless):
+            os.makedirs(self.screenshot_dir, exist_ok=True)
+            self._shot_queue = queue.Queue()
+            self._shot_writer = threading.Thread(target=self._write_screenshots, daemon=True)
+            self._shot_writer.start()
         logger.info("Browser started")
 
     def stop(self):
         """Close browser session"""
-        self.logout()  # End server-side session before closing browser
+        if self._state_path and self._logged_in:
+            self._save_session()  # Keep the session for the next run
+        else:
+            self.logout()  # End server-side session before closing browser
         if self.browser:
             self.browser.close()
         if self.playwright:
             self.playwright.stop()
+        if self._shot_writer:
+            self._shot_queue.put(None)
+            self._shot_writer.join(timeout=10)
         logger.info("Browser closed")
 
+    @staticmethod
+    def _filter_resources(route):
+        """Route handler: drop images/fonts/media, pass everything else through"""
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            route.abort()
+        else:
+            route.continue_()
+
+    def _save_session(self):
+        """Persist cookies/storage and the current app URL for the next run"""
+        try:
+            os.makedirs(SESSION_STATE_DIR, exist_ok=True)
+            self.context.storage_state(path=self._state_path)
+            os.chmod(self._state_path, 0o600)  # Holds live session cookies
+            with open(f"{self._state_path}.url", 'w') as f:
+                f.write(self.page.url)
+            logger.info("Saved portal session")
+        except Exception as e:
+            logger.warning(f"Could not save portal session: {e}")
+
+    def _resume_session(self) -> bool:
+        """Reopen the app page of a saved session; True if still logged in"""
+        url_path = f"{self._state_path}.url" if self._state_path else None
+        if not url_path or not os.path.exists(url_path):
+            return False
+        try:
+            with open(url_path) as f:
+                url = f.read().strip()
+            self.page.goto(url, wait_until="domcontentloaded", timeout=20000)
+            if '/login' in self.page.url or not self._wait_for_body_text('Logout', timeout=5000):
+                return False
+            if not self.page.evaluate('() => window.__dds.signals()')['provider']:
+                if not self.navigate_to_provider_selection():
+                    return False
+            logger.info("Resumed saved portal session - skipping login")
+            return True
+        except Exception as e:
+            logger.info(f"Saved portal session not usable: {e}")
+            return False
+
     def logout(self):
         """Log out of the portal to cleanly end the server-side session"""
+        self._provider_cache = None
         try:
             page_text = self.page.evaluate('() => document.body.innerText || ""')
             if 'Logout' in page_text:
@@ -176,112 +392,270 @@ class DDSeBillingBot:
     def _js_click(self, text: str) -> bool:
         """Click element containing text using JavaScript - most reliable method"""
         try:
-            result = self.page.evaluate(f'''() => {{
-                const elements = document.querySelectorAll('input, button, a, span, td');
-                for (const el of elements) {{
-                    const t = el.value || el.innerText || '';
-                    if (t.trim() === '{text}') {{
-                        el.click();
-                        return true;
-                    }}
-                }}
-                return false;
-            }}''')
-            return result
+            return self.page.evaluate(
+                "t => window.__dds ? window.__dds.clickByText(t) : false", text)
         except:
             return False
 
+    def _js_click_any(self, specs: List[Tuple[str, Optional[str]]], timeout: int = 3000,
+                      action: str = None) -> Optional[str]:
+        """
+        Click the first visible element matching any of several alternatives,
+        tested in order inside the page in one call (no per-selector timeouts).
+
+        specs: (css, text) pairs; text, if set, must appear in the element's
+        text (case-insensitive, like :has-text). Polls until something
+        matches or timeout ms pass. Returns the css that matched, or None.
+
+        action names the click in the selector profile: the alternative that
+        matched last time on this portal is tried first.
+        """
+        preferred = self._selector_profile.get(action) if action else None
+        if preferred:
+            specs = sorted(specs, key=lambda spec: spec[0] != preferred)
+        try:
+            handle = self.page.wait_for_function(
+                "specs => window.__dds.clickAny(specs)", arg=specs,
+                timeout=timeout, polling=100)
+            matched = handle.json_value()
+        except Exception:
+            return None
+        if action and matched != preferred:
+            self._remember_selector(action, matched)
+        return matched
+
+    def _load_selector_profile(self) -> Dict[str, str]:
+        """Selectors that matched on earlier runs against this portal"""
+        try:
+            with open(SELECTOR_PROFILE_PATH) as f:
+                return json.load(f).get(self.portal_url, {})
+        except (OSError, ValueError):
+            return {}
+
+    def _remember_selector(self, action: str, css: str):
+        """Record the matching alternative for action in the selector profile"""
+        self._selector_profile[action] = css
+        with _SELECTOR_PROFILE_LOCK:
+            try:
+                try:
+                    with open(SELECTOR_PROFILE_PATH) as f:
+                        profiles = json.load(f)
+                except (OSError, ValueError):
+                    profiles = {}
+                profiles.setdefault(self.portal_url, {})[action] = css
+                os.makedirs(SESSION_STATE_DIR, exist_ok=True)
+                tmp_path = f"{SELECTOR_PROFILE_PATH}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(profiles, f, indent=2)
+                os.replace(tmp_path, SELECTOR_PROFILE_PATH)
+            except OSError as e:
+                logger.warning(f"Could not save selector profile: {e}")
+
+    def _set_inventory(self, inventory: List[Dict]):
+        """Use inventory as the search-result cache and index it by (svc_code, month)"""
+        self._invoice_search_cache = inventory
+        self._invoice_index = {}
+        for inv in inventory:
+            key = (inv.get('svc_code'), _normalize_month(inv.get('svc_month', '')))
+            self._invoice_index.setdefault(key, inv)
+
+    def _checkpoint_file(self, provider_name: str) -> str:
+        key = hashlib.sha256(f"{self.portal_url}|{provider_name}".encode()).hexdigest()[:16]
+        return os.path.join(CHECKPOINT_DIR, f"{key}.jsonl")
+
+    def _load_checkpoint(self) -> Dict[str, Dict]:
+        """Results by _checkpoint_key() of records an interrupted run already submitted"""
+        done = {}
+        try:
+            with open(self._checkpoint_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Line cut short by the interruption
+                    done[entry['key']] = entry['result']
+        except OSError:
+            pass
+        return done
+
+    def _checkpoint(self, record: Dict, result: SubmissionResult):
+        """Append a successful submission to the checkpoint file"""
+        if not self._checkpoint_path or not result.success:
+            return
+        line = json.dumps({'key': _checkpoint_key(record), 'result': asdict(result)})
+        with _CHECKPOINT_LOCK:
+            try:
+                os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+                with open(self._checkpoint_path, 'a') as f:
+                    f.write(line + '\n')
+            except OSError as e:
+                logger.warning(f"Could not write checkpoint: {e}")
+
+    def _clear_checkpoint(self):
+        """Remove the checkpoint file once a run has been through all its invoices"""
+        if self._checkpoint_path:
+            try:
+                os.remove(self._checkpoint_path)
+            except OSError:
+                pass
+            self._checkpoint_path = None
+
+    def _inventory_path(self, provider_name: str) -> str:
+        key = hashlib.sha256(f"{self.portal_url}|{provider_name}".encode()).hexdigest()[:16]
+        return os.path.join(INVENTORY_CACHE_DIR, f"{key}.json")
+
+    def _load_inventory(self, provider_name: str) -> Optional[List[Dict]]:
+        """Inventory saved for this provider within INVENTORY_CACHE_TTL, else None"""
+        if INVENTORY_CACHE_TTL <= 0:
+            return None
+        path = self._inventory_path(provider_name)
+        try:
+            if time.time() - os.path.getmtime(path) > INVENTORY_CACHE_TTL:
+                return None
+            with open(path) as f:
+                return json.load(f) or None
+        except (OSError, ValueError):
+            return None
+
+    def _save_inventory(self, provider_name: str, inventory: List[Dict]):
+        """Save a freshly scraped inventory for _load_inventory()"""
+        if INVENTORY_CACHE_TTL <= 0 or not inventory:
+            return
+        path = self._inventory_path(provider_name)
+        try:
+            os.makedirs(INVENTORY_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(inventory, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save invoice inventory: {e}")
+
+    def _snapshot_rows(self) -> List[Dict]:
+        """
+        Cell texts of every table row with 6+ cells, as
+        [{'index': tr_index, 'cells': [text, ...]}]. Re-read from the page
+        only when the DOM has changed since the last snapshot.
+        """
+        snap = self.page.evaluate(
+            "known => window.__dds.snapshotRows(known)", self._row_cache_key)
+        if snap is not None:
+            self._row_cache_key = snap['version']
+            self._row_cache = snap['rows']
+        return self._row_cache
+
+    def _watch_navigation(self, page: Page):
+        """Drop per-page caches whenever the page's main frame navigates"""
+        def on_navigated(frame):
+            if frame.parent_frame is None:
+                self._calendar_days = None
+        page.on('framenavigated', on_navigated)
+
+    def _index_calendar(self) -> List[int]:
+        """
+        Stamp the open calendar's day inputs (data-cal-day) and return the
+        days found. Done once per calendar page; navigation clears it.
+        """
+        if self._calendar_days is None:
+            self._calendar_days = self.page.evaluate("() => window.__dds.indexCalendar()")
+        return self._calendar_days
+
     def _screenshot(self, name: str):
-        """Take a debug screenshot"""
+        """Take a debug screenshot (JPEG, written in the background)"""
+        if not self._shot_queue:
+            return
+        if not name.startswith('error'):
+            self._shot_counts[name] += 1
+            if (self._shot_counts[name] - 1) % SCREENSHOT_EVERY:
+                return
         try:
-            path = os.path.join(SCREENSHOT_DIR, f"{name}.png")
-            self.page.screenshot(path=path)
-            logger.info(f"Screenshot saved: {path}")
+            data = self.page.screenshot(type='jpeg', quality=50, full_page=False,
+                                        clip={'x': 0, 'y': 0, 'width': 1400, 'height': 900})
+            self._shot_queue.put((data, os.path.join(self.screenshot_dir, f"{name}.jpg")))
         except Exception as e:
             logger.warning(f"Screenshot failed: {e}")
 
-    def _click_launch_button(self) -> bool:
-        """Click LAUNCH APPLICATION button using multiple detection strategies"""
-        # Strategy 1: JavaScript - find image with onclick or launch link
-        clicked = self.page.evaluate('''() => {
-            // Try clicking the launch image (common pattern)
-            const launchImg = document.querySelector('#launch-box img[onclick], img[onclick*="launch"]');
-            if (launchImg) {
-                launchImg.click();
-                return 'clicked launch image';
-            }
-            // Try calling launchApp() directly if it exists
-            if (typeof launchApp === 'function') {
-                launchApp();
-                return 'called launchApp()';
-            }
-            // Try various text-based selectors
-            const selectors = [
-                'input[value*="LAUNCH" i]',
-                'button:contains("LAUNCH")',
-                'a:contains("LAUNCH")',
-                '[onclick*="launch" i]'
-            ];
-            for (const sel of selectors) {
-                try {
-                    const el = document.querySelector(sel);
-                    if (el) {
-                        el.click();
-                        return 'clicked via selector: ' + sel;
-                    }
-                } catch(e) {}
-            }
-            // Last resort: find any element with LAUNCH text
-            const allElements = document.querySelectorAll('input, button, a, img, span, div');
-            for (const el of allElements) {
-                const text = (el.value || el.innerText || el.alt || '').toUpperCase();
-                if (text.includes('LAUNCH')) {
-                    el.click();
-                    return 'clicked element with LAUNCH text';
-                }
-            }
-            return false;
-        }''')
+    def _write_screenshots(self):
+        """Screenshot writer thread - drains the queue until it gets None"""
+        while True:
+            item = self._shot_queue.get()
+            if item is None:
+                break
+            data, path = item
+            try:
+                with open(path, 'wb') as f:
+                    f.write(data)
+                logger.info(f"Screenshot saved: {path}")
+            except OSError as e:
+                logger.warning(f"Screenshot write failed: {e}")
+
+    def _wait_for_body_text(self, pattern: str, present: bool = True, timeout: int = 10000) -> bool:
+        """Wait until the page text does (or no longer does) match a JS regex; False on timeout"""
+        try:
+            self.page.wait_for_function(
+                "([p, present]) => new RegExp(p).test(document.body ? document.body.innerText : '') === present",
+                arg=[pattern, present], timeout=timeout)
+            return True
+        except Exception:
+            return False
 
-        if clicked:
-            logger.info(f"Launch button: {clicked}")
+    def _wait_ready(self, predicate_js: str, timeout: float = 10) -> bool:
+        """
+        Wait (polling every 100 ms) until the document has finished loading
+        and predicate_js, a JS expression, is truthy; False on timeout
+        """
+        try:
+            self.page.wait_for_function(
+                f"() => document.readyState === 'complete' && ({predicate_js})",
+                timeout=timeout * 1000, polling=100)
             return True
+        except Exception:
+            return False
 
-        # Strategy 2: Try Playwright text locator
+    def _dom_hash(self) -> int:
+        """Current __dds.domHash(), to hand to _wait_for_dom_change() after a click"""
+        return self.page.evaluate("() => window.__dds.domHash()")
+
+    def _wait_for_dom_change(self, dom_hash: int, timeout: int = 10000) -> bool:
+        """Wait until __dds.domHash() differs from dom_hash; False on timeout"""
         try:
-            self.page.get_by_text("LAUNCH APPLICATION", exact=False).first.click(timeout=3000)
-            logger.info("Clicked via Playwright text locator")
+            self.page.wait_for_function(
+                "h => window.__dds.domHash() !== h", arg=dom_hash, timeout=timeout)
             return True
-        except:
+        except Exception:
+            return False
+
+    def _click_launch_button(self) -> bool:
+        """Click LAUNCH APPLICATION button"""
+        # Every known form of the button as one locator, so a single
+        # auto-wait covers all of them instead of timing out on each in turn
+        launch = self.page.locator(LAUNCH_BUTTON_SELECTOR).or_(
+            self.page.get_by_text("LAUNCH APPLICATION"))
+        try:
+            launch.first.click(timeout=5000)
+            logger.info("Clicked LAUNCH APPLICATION")
+            return True
+        except Exception:
             pass
 
-        # Strategy 3: Try common button selectors
-        launch_selectors = [
-            'text="LAUNCH APPLICATION"',
-            'a:has-text("LAUNCH APPLICATION")',
-            'button:has-text("LAUNCH")',
-            'input[value*="LAUNCH" i]',
-            '.btn:has-text("Launch")',
-            'button.btn-primary',
-            'button.btn-lg',
-        ]
-        for selector in launch_selectors:
-            try:
-                self.page.click(selector, timeout=2000)
-                logger.info(f"Clicked via selector: {selector}")
-                return True
-            except:
-                continue
+        # No clickable button - call the page's launch handler directly
+        if self.page.evaluate("() => typeof launchApp === 'function' ? (launchApp(), true) : false"):
+            logger.info("Launch button: called launchApp()")
+            return True
 
         logger.error("Could not find LAUNCH APPLICATION button")
         return False
 
     def login(self) -> bool:
         """Login to the portal"""
+        if self._resume_session():
+            self._logged_in = True
+            return True
         try:
             logger.info(f"Navigating to {self.portal_url}")
-            self.page.goto(self.portal_url, wait_until="networkidle")
-            time.sleep(2)
+            # The launch handler only needs the parsed page and its inline
+            # scripts; the locator fallbacks in _click_launch_button auto-wait
+            self.page.goto(self.portal_url, wait_until="domcontentloaded", timeout=20000)
             self._screenshot("01_landing_page")
 
             # Click LAUNCH APPLICATION button - this opens a popup window
@@ -293,50 +667,35 @@ class DDSeBillingBot:
 
             # Switch to the popup window
             popup = popup_info.value
-            popup.wait_for_load_state("domcontentloaded")
+            popup.wait_for_selector('input[type="password"]', timeout=15000)
             self.page = popup
+            self._watch_navigation(popup)
             logger.info("Switched to login popup window")
 
-            time.sleep(2)
             self._screenshot("02_login_popup")
 
             # Find username field - try multiple selectors
             logger.info("Entering credentials...")
             username_filled = False
-            username_selectors = [
-                'input[type="text"]',
-                'input[name="username"]',
-                'input[name="userName"]',
-                'input[name="user"]',
-                'input[id="username"]',
-                'input[id="userName"]',
-            ]
-
-            for selector in username_selectors:
-                try:
-                    username_input = self.page.query_selector(selector)
-                    if username_input:
-                        username_input.fill(self.username)
-                        username_filled = True
-                        logger.info(f"Filled username using selector: {selector}")
-                        break
-                except Exception as e:
-                    continue
+            username_input = self.page.query_selector(USERNAME_INPUT_SELECTOR)
+            if username_input:
+                username_input.fill(self.username)
+                username_filled = True
+                logger.info("Filled username field")
 
             if not username_filled:
-                # Try JavaScript approach - find input near "Username" text
-                username_filled = self.page.evaluate(f'''() => {{
-                    const inputs = document.querySelectorAll('input');
-                    for (const input of inputs) {{
+                # Try JavaScript approach - first plain text input
+                username_filled = self.page.evaluate('''(username) => {
+                    for (const input of document.querySelectorAll('input')) {
                         const type = input.type.toLowerCase();
-                        if (type === 'text' || type === '') {{
-                            input.value = '{self.username}';
-                            input.dispatchEvent(new Event('input', {{ bubbles: true }}));
+                        if (type === 'text' || type === '') {
+                            input.value = username;
+                            input.dispatchEvent(new Event('input', { bubbles: true }));
                             return true;
-                        }}
-                    }}
+                        }
+                    }
                     return false;
-                }}''')
+                }''', self.username)
                 if username_filled:
                     logger.info("Filled username using JavaScript")
 
@@ -362,28 +721,20 @@ class DDSeBillingBot:
 
             # Click Login button
             login_clicked = False
-            login_selectors = [
-                'input[type="submit"][value="Login"]',
-                'input[value="Login"]',
-                'button:has-text("Login")',
-                'input[type="submit"]',
-            ]
-            for selector in login_selectors:
-                try:
-                    self.page.click(selector, timeout=3000)
-                    login_clicked = True
-                    logger.info(f"Clicked login using selector: {selector}")
-                    break
-                except:
-                    continue
+            try:
+                self.page.locator(LOGIN_BUTTON_SELECTOR).first.click(timeout=5000)
+                login_clicked = True
+                logger.info("Clicked login button")
+            except:
+                pass
 
             if not login_clicked:
                 # Try pressing Enter on password field
                 password_input.press("Enter")
                 logger.info("Pressed Enter to submit")
 
-            self.page.wait_for_load_state("networkidle")
-            time.sleep(3)
+            # Wait for whichever page the portal shows next (or a login error)
+            self._wait_for_body_text(POST_LOGIN_TEXT + '|invalid|incorrect', timeout=15000)
             self._screenshot("04_after_login")
 
             # Check for login errors
@@ -405,12 +756,18 @@ class DDSeBillingBot:
                     self._screenshot("error_still_on_login")
                     return False
 
-            # Post-login: handle dialogs in whatever order the portal presents them
-            import re
+            # Post-login: handle dialogs in whatever order the portal presents them.
+            # Each round after the first waits for the page's controls to change;
+            # if nothing changes there is nothing new to handle.
+            dom_hash = None
             for attempt in range(5):  # Max 5 rounds of dialog handling
-                time.sleep(2)
+                if dom_hash is not None and not self._wait_for_dom_change(dom_hash):
+                    break
+                if not self._wait_for_body_text(POST_LOGIN_TEXT):
+                    break
                 try:
-                    page_text = self.page.evaluate('() => document.body.innerText || ""')
+                    dom_hash, signals = self.page.evaluate(
+                        '() => [window.__dds.domHash(), window.__dds.signals()]')
                 except:
                     break
 
@@ -418,56 +775,39 @@ class DDSeBillingBot:
                 logger.info(f"Post-login round {attempt}: checking page state...")
 
                 # 1. Check for password expiry overlay
-                expiry_match = re.search(r'password will expire in (\d+) day', page_text)
-                if expiry_match:
-                    self.password_expiry_days = int(expiry_match.group(1))
+                if signals['expiryDays'] is not None:
+                    self.password_expiry_days = signals['expiryDays']
                     logger.warning(f"Password expires in {self.password_expiry_days} days")
                     self._js_click("OK")
-                    time.sleep(1)
+                    self._wait_for_body_text('password will expire', present=False, timeout=5000)
                     continue  # Re-check page after dismissing
 
                 # 2. Check for agreement dialog (must come before User Profile check
                 #    because "My Profile" nav link appears on every page including Dashboard)
-                if 'I do not agree' in page_text:
+                if signals['agreement']:
                     logger.info("Accepting user agreement...")
-                    self.page.evaluate('''() => {
-                        const elements = document.querySelectorAll('input, button, a');
-                        for (const el of elements) {
-                            const text = (el.value || el.innerText || '').trim();
-                            if (text === 'Accept' || text === 'I Agree' || text === 'ACCEPT') {
-                                el.click();
-                                return true;
-                            }
-                        }
-                        return false;
-                    }''')
-                    try:
-                        self.page.wait_for_load_state("networkidle")
-                    except:
-                        pass
-                    time.sleep(1)
+                    self.page.evaluate(
+                        "labels => labels.some(t => window.__dds.clickByText(t))",
+                        ['Accept', 'I Agree', 'ACCEPT'])
+                    self._wait_for_body_text('I do not agree', present=False, timeout=15000)
                     continue  # Re-check page after accepting
 
                 # 3. Check for User Profile / change password form
                 #    Use "User Profile of" to match the page heading, not the "My Profile" nav link
-                if 'User Profile of' in page_text:
+                if signals['profile']:
                     logger.info("On User Profile page, clicking Close...")
                     self._js_click("Close")
-                    time.sleep(1)
-                    try:
-                        self.page.wait_for_load_state("networkidle")
-                    except:
-                        pass
-                    time.sleep(1)
+                    self._wait_for_body_text('User Profile of', present=False, timeout=15000)
                     continue  # Re-check page after closing
 
                 # 4. If we see Service Provider Selection, we're done
-                if 'Service Provider Selection' in page_text:
+                if signals['provider']:
                     logger.info("Reached Service Provider Selection — login complete")
                     break
 
             self._screenshot("05_after_navigation")
             logger.info("Login successful")
+            self._logged_in = True
             return True
 
         except Exception as e:
@@ -508,10 +848,12 @@ class DDSeBillingBot:
 
             if result:
                 logger.info(f"Provider selection: {result}")
-                time.sleep(2)
-                self._js_click("OK")
-                self.page.wait_for_load_state("networkidle")
-                time.sleep(2)
+                try:
+                    self.page.get_by_role("button", name="OK", exact=True).first.click(timeout=3000)
+                except:
+                    pass
+                if not self._wait_ready(INVOICES_TAB_JS, timeout=15):
+                    logger.warning("Invoices tab not visible after provider selection")
                 self._screenshot("06_after_provider_select")
                 logger.info("First provider selected")
                 return True
@@ -521,78 +863,30 @@ class DDSeBillingBot:
             logger.error(f"Failed to select first provider: {e}")
             return False
 
-    def get_available_providers(self) -> List[Dict]:
-        """Read all providers from the provider selection table without clicking any."""
+    def get_available_providers(self, refresh: bool = False) -> List[Dict]:
+        """Read all providers from the provider selection table without clicking any.
+
+        The list only changes between logins, so it is read once per session;
+        pass refresh=True to re-read the grid.
+        """
+        if self._provider_cache is not None and not refresh:
+            return list(self._provider_cache)
         try:
             logger.info("Reading available providers from table...")
             time.sleep(1)
             self._screenshot("provider_table_read")
 
-            # Diagnostic: log grid structure to confirm multi-view layout
-            diag = self.page.evaluate('''() => {
-                return {
-                    dojoxGridRows: document.querySelectorAll('.dojoxGridRow').length,
-                    dojoxGridCells: document.querySelectorAll('.dojoxGridCell').length,
-                    sampleCells: Array.from(document.querySelectorAll('.dojoxGridCell'))
-                        .slice(0, 10).map(c => (c.innerText || '').trim().substring(0, 20))
-                };
-            }''')
-            logger.info(f"Grid diagnostic: {diag}")
-
-            # Dojo DataGrid multi-view layout: each column is in a separate "view",
-            # so each .dojoxGridRow contains only 1 cell. Search ALL cells individually.
-            providers = self.page.evaluate('''() => {
-                const results = [];
-                const seen = new Set();
-                const allCells = document.querySelectorAll('.dojoxGridCell');
-                for (const cell of allCells) {
-                    const text = (cell.innerText || '').trim();
-                    if (/^[A-Za-z]{2}\\d+$/.test(text) && !seen.has(text.toUpperCase())) {
-                        seen.add(text.toUpperCase());
-                        let name = '';
-                        const row = cell.closest('.dojoxGridRow');
-                        const content = row?.closest('.dojoxGridContent, .dojoxGridScrollbox');
-                        if (content) {
-                            const rowIdx = Array.from(
-                                content.querySelectorAll('.dojoxGridRow')
-                            ).indexOf(row);
-                            const view = content.closest('.dojoxGridView');
-                            const allViews = view?.parentElement?.querySelectorAll(':scope > .dojoxGridView') || [];
-                            for (const v of allViews) {
-                                if (v === view) continue;
-                                const otherRows = v.querySelectorAll('.dojoxGridContent .dojoxGridRow, .dojoxGridScrollbox .dojoxGridRow');
-                                if (otherRows[rowIdx]) {
-                                    const otherText = (otherRows[rowIdx].innerText || '').trim();
-                                    if (otherText && !/^[A-Za-z]{2}\\d+$/.test(otherText)) {
-                                        name = otherText;
-                                    }
-                                }
-                            }
-                        }
-                        results.push({ spn_id: text.toUpperCase(), name: name });
-                    }
-                }
-                // Fallback: try plain td cells if dojoxGridCell returned nothing
-                if (results.length === 0) {
-                    const tds = document.querySelectorAll('td');
-                    for (const td of tds) {
-                        const text = (td.innerText || '').trim();
-                        if (/^[A-Za-z]{2}\\d+$/.test(text) && !seen.has(text.toUpperCase())) {
-                            seen.add(text.toUpperCase());
-                            // Get description from next sibling td
-                            const nextTd = td.nextElementSibling;
-                            const name = nextTd ? (nextTd.innerText || '').trim() : '';
-                            results.push({ spn_id: text.toUpperCase(), name: name });
-                        }
-                    }
-                }
-                return results;
-            }''')
+            grid = self.page.evaluate("() => window.__dds.readProviderGrid()")
+            # Diagnostic: grid structure, to confirm the multi-view layout
+            logger.info(f"Grid diagnostic: {grid['diag']}")
+            providers = grid['providers']
 
             logger.info(f"Found {len(providers)} providers in table")
             for p in providers:
                 logger.info(f"  Provider: {p['spn_id']} - {p['name']}")
-            return providers
+            if providers:
+                self._provider_cache = providers
+            return list(providers)
         except Exception as e:
             logger.error(f"Failed to read provider table: {e}")
             return []
@@ -603,113 +897,31 @@ class DDSeBillingBot:
             logger.info(f"Selecting provider: {provider_identifier}")
             self._screenshot("05_provider_selection")
 
-            clicked = False
-
-            # Method 1: Try exact SPN ID match — search individual cells (multi-view layout)
-            clicked = self.page.evaluate(f'''() => {{
-                const allCells = document.querySelectorAll('.dojoxGridCell');
-                for (const cell of allCells) {{
-                    const text = (cell.innerText || '').trim();
-                    if (text.toUpperCase() === '{provider_identifier}'.toUpperCase()) {{
-                        const row = cell.closest('.dojoxGridRow');
-                        if (row) {{ row.click(); return true; }}
-                        cell.click();
-                        return true;
-                    }}
-                }}
-                return false;
-            }}''')
+            # One pass over the grid trying exact SPN, numeric SPN, name and
+            # plain-td matches in that order (see dds_helpers.js)
+            clicked = self.page.evaluate(
+                "ident => window.__dds.findProviderByIdent(ident)", provider_identifier)
 
             if clicked:
-                logger.info(f"Selected provider by exact SPN ID: {provider_identifier}")
-
-            # Method 2: Try matching just the numeric portion of SPN ID
-            # (handles cases where prefix differs, e.g., HP1829 vs PP1829)
-            if not clicked:
-                numeric_part = ''.join(c for c in provider_identifier if c.isdigit())
-                if numeric_part:
-                    clicked = self.page.evaluate(f'''() => {{
-                        const allCells = document.querySelectorAll('.dojoxGridCell');
-                        for (const cell of allCells) {{
-                            const text = (cell.innerText || '').trim();
-                            if (text.match(/[A-Za-z]+{numeric_part}$/i)) {{
-                                const row = cell.closest('.dojoxGridRow');
-                                if (row) {{ row.click(); return true; }}
-                                cell.click();
-                                return true;
-                            }}
-                        }}
-                        return false;
-                    }}''')
-                    if clicked:
-                        logger.info(f"Selected provider by numeric match: {numeric_part}")
-
-            # Method 3: Fall back to provider name text match (case-insensitive)
-            if not clicked:
-                # Escape special characters for JavaScript string
-                safe_identifier = provider_identifier.replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"')
-                clicked = self.page.evaluate(f'''() => {{
-                    const searchTerm = '{safe_identifier}'.toLowerCase();
-                    const allCells = document.querySelectorAll('.dojoxGridCell');
-                    for (const cell of allCells) {{
-                        if ((cell.innerText || '').toLowerCase().includes(searchTerm)) {{
-                            const row = cell.closest('.dojoxGridRow');
-                            if (row) {{ row.click(); return true; }}
-                            cell.click();
-                            return true;
-                        }}
-                    }}
-                    return false;
-                }}''')
-                if clicked:
-                    logger.info(f"Selected provider by name match: {provider_identifier}")
-
-            # Method 4: Fallback to plain td elements
-            if not clicked:
-                safe_identifier = provider_identifier.replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"')
-                clicked = self.page.evaluate(f'''() => {{
-                    const tds = document.querySelectorAll('td');
-                    for (const td of tds) {{
-                        const text = (td.innerText || '').trim();
-                        if (text.toUpperCase() === '{safe_identifier}'.toUpperCase() ||
-                            text.toLowerCase().includes('{safe_identifier}'.toLowerCase())) {{
-                            const row = td.closest('tr');
-                            if (row) {{ row.click(); return true; }}
-                        }}
-                    }}
-                    // Also try SPN pattern match on td elements
-                    for (const td of tds) {{
-                        const text = (td.innerText || '').trim();
-                        if (/^[A-Za-z]{{2}}\\d+$/.test(text)) {{
-                            const numericPart = text.replace(/[A-Za-z]/g, '');
-                            const searchNumeric = '{safe_identifier}'.replace(/[A-Za-z]/g, '');
-                            if (numericPart === searchNumeric) {{
-                                const row = td.closest('tr');
-                                if (row) {{ row.click(); return true; }}
-                            }}
-                        }}
-                    }}
-                    return false;
-                }}''')
-                if clicked:
-                    logger.info(f"Selected provider by td fallback: {provider_identifier}")
+                logger.info(f"Selected provider '{provider_identifier}' by {clicked} match")
 
             if not clicked:
                 logger.error(f"Provider '{provider_identifier}' not found")
                 self._screenshot("error_provider_not_found")
                 return False
 
-            time.sleep(2)
-
-            # Click OK on confirmation dialog if present
+            # Click OK on confirmation dialog if present (auto-waits until
+            # the button is actionable; gives up quickly if there is no dialog)
             try:
-                self._js_click("OK")
-                time.sleep(1)
+                self.page.get_by_role("button", name="OK", exact=True).first.click(timeout=3000)
             except:
                 pass
 
-            self.page.wait_for_load_state("networkidle")
-            time.sleep(2)
+            # Provider is selected once the main navigation is up
+            try:
+                self.page.wait_for_selector("text=Invoices", timeout=15000)
+            except:
+                logger.warning("Invoices tab not visible after provider selection")
             self._screenshot("06_after_provider_select")
             logger.info(f"Provider '{provider_identifier}' selected")
             return True
@@ -723,22 +935,11 @@ class DDSeBillingBot:
         """Navigate to Invoices tab and search"""
         try:
             logger.info("Clicking Invoices tab...")
+            self._open_invoice_id = None
 
             # Try multiple methods to click Invoices tab
-            clicked = False
-            tab_selectors = [
-                'a:has-text("Invoices")',
-                'li:has-text("Invoices") a',
-                'nav a:has-text("Invoices")',
-                '*[role="tab"]:has-text("Invoices")',
-            ]
-            for selector in tab_selectors:
-                try:
-                    self.page.click(selector, timeout=3000)
-                    clicked = True
-                    break
-                except:
-                    continue
+            clicked = self._js_click_any([('a', 'Invoices'), ('[role="tab"]', 'Invoices')],
+                                         action='invoices_tab')
 
             if not clicked:
                 # Try JavaScript
@@ -749,78 +950,14 @@ class DDSeBillingBot:
                 self._screenshot("error_no_invoices_tab")
                 return False
 
-            self.page.wait_for_load_state("networkidle")
-            time.sleep(2)
-            self._screenshot("07_invoices_tab")
-
-            # Click Search button - try multiple methods
-            logger.info("Clicking Search button...")
-            search_clicked = False
-
-            # Method 1: Direct button click
-            search_selectors = [
-                'input[value="Search"]',
-                'button:has-text("Search")',
-                'input[type="button"][value="Search"]',
-                'input[type="submit"][value="Search"]',
-            ]
-            for selector in search_selectors:
-                try:
-                    self.page.click(selector, timeout=3000)
-                    search_clicked = True
-                    logger.info(f"Clicked Search via: {selector}")
-                    break
-                except:
-                    continue
-
-            # Method 2: JavaScript click
-            if not search_clicked:
-                search_clicked = self.page.evaluate('''() => {
-                    const buttons = document.querySelectorAll('input, button');
-                    for (const btn of buttons) {
-                        const val = (btn.value || btn.innerText || '').trim();
-                        if (val === 'Search') {
-                            btn.click();
-                            return true;
-                        }
-                    }
-                    return false;
-                }''')
-                if search_clicked:
-                    logger.info("Clicked Search via JavaScript")
-
-            if not search_clicked:
-                logger.warning("Could not click Search button")
-
-            self.page.wait_for_load_state("networkidle")
-            time.sleep(2)
-
-            # Wait for table content to appear (invoice IDs are 7-digit numbers)
-            logger.info("Waiting for invoice table to load...")
             try:
-                # Wait up to 10 seconds for invoice data to appear
-                self.page.wait_for_function(
-                    '''() => {
-                        // Check standard td cells
-                        const tds = document.querySelectorAll('td');
-                        for (const td of tds) {
-                            if (/^\\d{7}$/.test((td.innerText || '').trim())) return true;
-                        }
-                        // Check Dojo DataGrid cells
-                        const gridCells = document.querySelectorAll('.dojoxGridCell');
-                        for (const cell of gridCells) {
-                            if (/^\\d{7}$/.test((cell.innerText || '').trim())) return true;
-                        }
-                        return false;
-                    }''',
-                    timeout=10000
-                )
-                logger.info("Invoice table data loaded successfully")
-            except Exception as e:
-                logger.warning(f"Timeout waiting for invoice table data: {e}")
-                # Continue anyway - the table might be empty legitimately
+                self.page.locator('input[value="Search"], button:has-text("Search")').first.wait_for(
+                    state="visible", timeout=10000)
+            except:
+                pass
+            self._screenshot("07_invoices_tab")
 
-            time.sleep(1)
+            self._search_invoices()
             self._screenshot("08_after_search")
 
             return True
@@ -829,49 +966,63 @@ class DDSeBillingBot:
             self._screenshot("error_navigation")
             return False
 
+    def _search_invoices(self):
+        """Click Search on the Invoices tab and wait for the results table"""
+        # Click Search button - try multiple methods
+        logger.info("Clicking Search button...")
+        search_clicked = self._js_click_any([('input[value="Search"]', None), ('button', 'Search')],
+                                            action='search_button')
+        if search_clicked:
+            logger.info(f"Clicked Search via: {search_clicked}")
+        else:
+            # Fallback: any element whose text is exactly "Search"
+            search_clicked = self._js_click("Search")
+            if search_clicked:
+                logger.info("Clicked Search via JavaScript")
+
+        if not search_clicked:
+            logger.warning("Could not click Search button")
+
+        # Wait for table content to appear (invoice IDs are 7-digit numbers)
+        logger.info("Waiting for invoice table to load...")
+        try:
+            # Wait up to 10 seconds for a visible invoice-ID cell (plain
+            # table or Dojo DataGrid); the locator auto-waits
+            self.page.locator('td, .dojoxGridCell').filter(
+                has_text=_INVOICE_ID_RE).first.wait_for(state="visible", timeout=10000)
+            logger.info("Invoice table data loaded successfully")
+        except Exception as e:
+            logger.warning(f"Timeout waiting for invoice table data: {e}")
+            # Continue anyway - the table might be empty legitimately
+
+    def _try_nav(self, label: str, link: bool = False, timeout: int = 5000) -> bool:
+        """
+        Click a nav item and wait for Service Provider Selection in one
+        evaluate (see __dds.tryNav); True if the page showed up in time
+        """
+        try:
+            return bool(self.page.evaluate(
+                "([label, ms, link]) => window.__dds.tryNav(label, ms, link)",
+                [label, timeout, link]))
+        except Exception:
+            # The click navigated the page and took the evaluate with it
+            return self._wait_ready(PROVIDER_SELECTION_JS, timeout=timeout / 1000)
+
     def navigate_to_provider_selection(self) -> bool:
         """Navigate back to Service Provider Selection (Dashboard)"""
         try:
             logger.info("Navigating back to Service Provider Selection...")
             self._screenshot("nav_back_before")
 
-            # Strategy 1: Click "Home" tab (main nav) — this is the primary nav tab
-            self._js_click("Home")
-            time.sleep(2)
-            self.page.wait_for_load_state("networkidle")
-            time.sleep(1)
-
-            page_text = self.page.evaluate('() => document.body.innerText || ""')
-            if 'Service Provider Selection' in page_text:
-                logger.info("Back at Service Provider Selection via Home tab")
-                self._screenshot("nav_back_success")
-                return True
-
-            # Strategy 2: Click "Dashboard" sub-tab (under Home)
-            self._js_click("Dashboard")
-            time.sleep(2)
-            self.page.wait_for_load_state("networkidle")
-            time.sleep(1)
-
-            page_text = self.page.evaluate('() => document.body.innerText || ""')
-            if 'Service Provider Selection' in page_text:
-                logger.info("Back at Service Provider Selection via Dashboard sub-tab")
-                self._screenshot("nav_back_success")
-                return True
-
-            # Strategy 3: Try Playwright selectors for nav links
-            for link_text in ["Home", "Dashboard", "Service Provider"]:
-                try:
-                    self.page.click(f'a:has-text("{link_text}")', timeout=3000)
-                    time.sleep(2)
-                    self.page.wait_for_load_state("networkidle")
-                    page_text = self.page.evaluate('() => document.body.innerText || ""')
-                    if 'Service Provider Selection' in page_text:
-                        logger.info(f"Back at Service Provider Selection via '{link_text}' link")
-                        self._screenshot("nav_back_success")
-                        return True
-                except:
-                    continue
+            # "Home" tab (main nav) first, then the "Dashboard" sub-tab under
+            # it, then any nav link whose text contains the label
+            steps = [("Home", False), ("Dashboard", False),
+                     ("Home", True), ("Dashboard", True), ("Service Provider", True)]
+            for label, link in steps:
+                if self._try_nav(label, link):
+                    logger.info(f"Back at Service Provider Selection via '{label}' {'link' if link else 'tab'}")
+                    self._screenshot("nav_back_success")
+                    return True
 
             logger.warning("Could not navigate back to Service Provider Selection")
             self._screenshot("nav_back_failed")
@@ -891,7 +1042,7 @@ class DDSeBillingBot:
             let tableInfo = [];
             tables.forEach((t, i) => {
                 const rows = t.querySelectorAll('tr').length;
-                const text = t.innerText.substring(0, 100);
+                const text = t.textContent.substring(0, 400).replace(/\\s+/g, ' ').trim().substring(0, 100);
                 tableInfo.push({index: i, rows: rows, preview: text});
             });
 
@@ -912,27 +1063,40 @@ class DDSeBillingBot:
         Detects invoice table by looking for 7-digit invoice IDs in either
         standard HTML table cells or Dojo DataGrid cells.
         Returns True if table data found, False if timeout.
+
+        One evaluate: a MutationObserver re-checks only when the DOM changes
+        and resolves the promise on the first match.
         """
-        import time as time_module
-        start = time_module.time()
-        while time_module.time() - start < timeout:
-            has_data = self.page.evaluate('''() => {
-                // Check standard HTML table cells
-                const tds = document.querySelectorAll('td');
-                for (const td of tds) {
-                    if (/^\\d{7}$/.test((td.innerText || '').trim())) return true;
-                }
-                // Check Dojo DataGrid cells
-                const gridCells = document.querySelectorAll('.dojoxGridCell');
-                for (const cell of gridCells) {
-                    if (/^\\d{7}$/.test((cell.innerText || '').trim())) return true;
-                }
-                return false;
-            }''')
-            if has_data:
-                logger.info("Invoice table data detected")
-                return True
-            time_module.sleep(0.5)
+        try:
+            has_data = self.page.evaluate('''(timeoutMs) => new Promise((resolve) => {
+                // textContent, unlike innerText, does not force a layout
+                const RE = /^\\d{7}$/;
+                const check = () => {
+                    // Check standard HTML table cells
+                    const tds = document.getElementsByTagName('td');
+                    for (let i = 0; i < tds.length; i++) {
+                        if (RE.test((tds[i].textContent || '').trim())) return true;
+                    }
+                    // Check Dojo DataGrid cells
+                    const gridCells = document.getElementsByClassName('dojoxGridCell');
+                    for (let i = 0; i < gridCells.length; i++) {
+                        if (RE.test((gridCells[i].textContent || '').trim())) return true;
+                    }
+                    return false;
+                };
+                if (check()) { resolve(true); return; }
+                const timer = setTimeout(() => { obs.disconnect(); resolve(false); }, timeoutMs);
+                const obs = new MutationObserver(() => {
+                    if (check()) { obs.disconnect(); clearTimeout(timer); resolve(true); }
+                });
+                obs.observe(document.body, { childList: true, subtree: true, characterData: true });
+            })''', timeout * 1000)
+        except Exception as e:
+            logger.warning(f"Invoice table wait interrupted: {e}")
+            has_data = False
+        if has_data:
+            logger.info("Invoice table data detected")
+            return True
         logger.warning("Timeout waiting for invoice table data")
         return False
 
@@ -953,152 +1117,153 @@ class DDSeBillingBot:
             # First, wait for table data to be present
             self._wait_for_invoice_table(timeout=10)
 
-            # Find and extract invoices using data-pattern detection (not header text)
-            result = self.page.evaluate('''() => {
-                const invoices = [];
-                const tables = document.querySelectorAll('table');
-                const debug = {
-                    tableCount: tables.length,
-                    tableSummary: [],
-                    bestTableIndex: -1,
-                    bestTableInvoiceCount: 0
-                };
+            # Dojo pages render the results as a DataGrid, not a <table>;
+            # skip the table scan there and only fall back to it if empty
+            is_dojo = self.page.evaluate(
+                "() => document.getElementsByClassName('dojoxGridView').length > 0")
+            invoices = self._scrape_invoices_from_dojo_grid() if is_dojo else []
+            if not invoices:
+                invoices = self._scrape_invoices_from_html_tables()
 
-                // Find the table with the most invoice-like rows (7-digit IDs in column 1)
-                let bestTable = null;
-                let bestCount = 0;
-
-                for (let i = 0; i < tables.length; i++) {
-                    const table = tables[i];
-                    const rows = table.querySelectorAll('tr');
-                    let invoiceRowCount = 0;
-
-                    for (const row of rows) {
-                        const cells = row.querySelectorAll('td');
-                        if (cells.length >= 6) {
-                            // Check if cell 1 looks like an invoice ID (7 digits)
-                            const cell1Text = cells[1]?.innerText?.trim() || '';
-                            if (/^\\d{7}$/.test(cell1Text)) {
-                                invoiceRowCount++;
-                            }
-                        }
-                    }
+            logger.info(f"Found {len(invoices)} invoices in table")
+            for inv in invoices:
+                logger.info(f"  Invoice {inv['invoice_id']}: SVC={inv['svc_code']}, Month={inv['svc_month']}, UCI={inv['uci'] or '(multi)'}")
 
-                    debug.tableSummary.push({
-                        index: i,
-                        rowCount: rows.length,
-                        invoiceRowCount: invoiceRowCount
-                    });
-
-                    if (invoiceRowCount > bestCount) {
-                        bestCount = invoiceRowCount;
-                        bestTable = table;
-                        debug.bestTableIndex = i;
-                        debug.bestTableInvoiceCount = invoiceRowCount;
-                    }
-                }
+            return invoices
 
-                if (!bestTable) {
-                    return { invoices: invoices, debug: debug };
-                }
+        except Exception as e:
+            logger.exception(f"Failed to cache invoice search results: {e}")
+            return []
+
+    def _scrape_invoices_from_html_tables(self) -> list:
+        """Scrape invoice rows from the standard HTML table with the most
+        7-digit invoice IDs (column layout: see cache_invoice_search_results)"""
+        # Find and extract invoices using data-pattern detection (not header text)
+        result = self.page.evaluate('''() => {
+            const invoices = [];
+            const tables = document.getElementsByTagName('table');
+            const debug = {
+                tableCount: tables.length,
+                tableSummary: [],
+                bestTableIndex: -1,
+                bestTableInvoiceCount: 0
+            };
 
-                // Now extract data from the best table
-                const rows = bestTable.querySelectorAll('tr');
-                let rowIndex = 0;
-
-                for (const row of rows) {
-                    const cells = row.querySelectorAll('td');
-                    if (cells.length < 6) continue;
-
-                    const invoiceId = cells[1]?.innerText?.trim() || '';
-                    if (!/^\\d{7}$/.test(invoiceId)) continue;
-
-                    const svcCode = cells[2]?.innerText?.trim() || '';
-                    const svcMonth = cells[3]?.innerText?.trim() || '';
-                    const uci = cells[4]?.innerText?.trim() || '';
-                    const consumerName = cells[5]?.innerText?.trim() || '';
-
-                    // Basic validation
-                    if (!/^\\d+$/.test(svcCode)) continue;
-                    if (!svcMonth.includes('/')) continue;
-
-                    invoices.push({
-                        invoice_id: invoiceId,
-                        svc_code: svcCode,
-                        svc_month: svcMonth,
-                        uci: uci,
-                        consumer_name: consumerName,
-                        row_index: rowIndex,
-                        has_uci: uci.length > 0
-                    });
-                    rowIndex++;
+            // Score each table by the 7-digit cells in its innerText (cells
+            // are tab-separated, rows newline-separated) - one native regex
+            // pass per table instead of walking every row and cell
+            const idCell = /(?:^|\\t)\\d{7}(?=\\t|$)/gm;
+            const RE = /^\\d{7}$/;
+            let bestTable = null;
+            let bestCount = 0;
+
+            for (let i = 0; i < tables.length; i++) {
+                const table = tables[i];
+                const candidates = ((table.innerText || '').match(idCell) || []).length;
+
+                debug.tableSummary.push({
+                    index: i,
+                    rowCount: table.getElementsByTagName('tr').length,
+                    candidates: candidates
+                });
+
+                if (candidates > bestCount) {
+                    bestCount = candidates;
+                    bestTable = table;
+                    debug.bestTableIndex = i;
                 }
+            }
 
+            if (!bestTable) {
                 return { invoices: invoices, debug: debug };
-            }''')
+            }
 
-            # Extract debug info and invoices
-            debug_info = result.get('debug', {})
-            invoices = result.get('invoices', [])
-
-            # Log debug information
-            logger.info(f"Table detection: {debug_info.get('tableCount', 0)} tables found")
-            if debug_info.get('tableSummary'):
-                for ts in debug_info['tableSummary']:
-                    logger.info(f"  Table {ts['index']}: {ts['rowCount']} rows, {ts['invoiceRowCount']} invoice rows")
-            if debug_info.get('bestTableIndex', -1) >= 0:
-                logger.info(f"Selected table {debug_info['bestTableIndex']} with {debug_info['bestTableInvoiceCount']} invoice rows")
-            else:
-                logger.warning("No invoice table found in standard HTML tables, trying Dojo DataGrid...")
+            // Now extract data from the best table
+            const rows = bestTable.getElementsByTagName('tr');
+            let rowIndex = 0;
 
-            # Fallback: Dojo DataGrid (multi-view layout where each column is a separate view)
-            if not invoices:
-                invoices = self._scrape_invoices_from_dojo_grid()
+            for (let r = 0, n = rows.length; r < n; r++) {
+                const cells = rows[r].getElementsByTagName('td');
+                if (cells.length < 6) continue;
 
-            logger.info(f"Found {len(invoices)} invoices in table")
-            for inv in invoices:
-                logger.info(f"  Invoice {inv['invoice_id']}: SVC={inv['svc_code']}, Month={inv['svc_month']}, UCI={inv['uci'] or '(multi)'}")
+                // textContent: plain text without forcing a layout per cell
+                const invoiceId = (cells[1].textContent || '').trim();
+                if (!RE.test(invoiceId)) continue;
 
-            return invoices
+                const svcCode = (cells[2].textContent || '').trim();
+                const svcMonth = (cells[3].textContent || '').trim();
+                const uci = (cells[4].textContent || '').trim();
+                const consumerName = (cells[5].textContent || '').trim();
 
-        except Exception as e:
-            logger.error(f"Failed to cache invoice search results: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-            return []
+                // Basic validation
+                if (!/^\\d+$/.test(svcCode)) continue;
+                if (!svcMonth.includes('/')) continue;
+
+                invoices.push({
+                    invoice_id: invoiceId,
+                    svc_code: svcCode,
+                    svc_month: svcMonth,
+                    uci: uci,
+                    consumer_name: consumerName,
+                    row_index: rowIndex,
+                    has_uci: uci.length > 0
+                });
+                rowIndex++;
+            }
+            debug.bestTableInvoiceCount = invoices.length;
+
+            return { invoices: invoices, debug: debug };
+        }''')
+
+        # Extract debug info and invoices
+        debug_info = result.get('debug', {})
+        invoices = result.get('invoices', [])
+
+        # Log debug information
+        logger.info(f"Table detection: {debug_info.get('tableCount', 0)} tables found")
+        if debug_info.get('tableSummary'):
+            for ts in debug_info['tableSummary']:
+                logger.info(f"  Table {ts['index']}: {ts['rowCount']} rows, {ts['candidates']} invoice-ID cells")
+        if debug_info.get('bestTableIndex', -1) >= 0:
+            logger.info(f"Selected table {debug_info['bestTableIndex']} with {debug_info['bestTableInvoiceCount']} invoice rows")
+        else:
+            logger.warning("No invoice table found in standard HTML tables")
+
+        return invoices
 
     def _scrape_visible_dojo_rows(self) -> list:
         """Scrape currently visible invoice rows from Dojo DataGrid.
         Each column lives in a separate 'view' div. We merge cells across
         views by row index to reconstruct full rows."""
         result = self.page.evaluate('''() => {
-            const views = document.querySelectorAll('.dojoxGridView');
+            const RE = /^\\d{7}$/;
+            const views = document.getElementsByClassName('dojoxGridView');
             if (!views.length) return { invoices: [], debug: 'no dojoxGridView found' };
 
-            // Collect cell texts from each view, organized by row
-            const viewData = [];
-            for (const view of views) {
-                const rows = view.querySelectorAll(
+            // Each view's rendered rows; the longest view sets the row count
+            const viewRows = new Array(views.length);
+            let rowCount = 0;
+            for (let v = 0; v < views.length; v++) {
+                viewRows[v] = views[v].querySelectorAll(
                     '.dojoxGridContent .dojoxGridRow, .dojoxGridScrollbox .dojoxGridRow'
                 );
-                const rowTexts = [];
-                for (const row of rows) {
-                    const cells = row.querySelectorAll('.dojoxGridCell');
-                    const texts = Array.from(cells).map(c => (c.innerText || '').trim());
-                    rowTexts.push(texts);
-                }
-                viewData.push(rowTexts);
+                if (viewRows[v].length > rowCount) rowCount = viewRows[v].length;
             }
 
-            // Merge views into virtual rows (concatenate cells from each view)
-            const rowCount = Math.max(...viewData.map(v => v.length), 0);
-            const virtualRows = [];
-            for (let r = 0; r < rowCount; r++) {
-                const row = [];
-                for (const vd of viewData) {
-                    if (vd[r]) row.push(...vd[r]);
+            // Merge views into virtual rows (concatenate cells from each view),
+            // writing each cell's text straight into its row
+            const virtualRows = new Array(rowCount);
+            for (let r = 0; r < rowCount; r++) virtualRows[r] = [];
+            for (let v = 0; v < viewRows.length; v++) {
+                const rows = viewRows[v];
+                for (let r = 0; r < rows.length; r++) {
+                    const cells = rows[r].getElementsByClassName('dojoxGridCell');
+                    const out = virtualRows[r];
+                    // textContent: plain text without forcing a layout per cell
+                    for (let i = 0; i < cells.length; i++) {
+                        out.push((cells[i].textContent || '').trim());
+                    }
                 }
-                virtualRows.push(row);
             }
 
             // Find invoice rows: look for a 7-digit number in each virtual row
@@ -1108,7 +1273,7 @@ class DDSeBillingBot:
                 // Find the invoice ID cell (7 digits)
                 let idIdx = -1;
                 for (let c = 0; c < cells.length; c++) {
-                    if (/^\\d{7}$/.test(cells[c])) { idIdx = c; break; }
+                    if (RE.test(cells[c])) { idIdx = c; break; }
                 }
                 if (idIdx < 0) continue;
 
@@ -1144,131 +1309,163 @@ class DDSeBillingBot:
         }''')
         return result
 
-    def _scrape_invoices_from_dojo_grid(self) -> list:
-        """Scrape ALL invoice data from Dojo DataGrid by scrolling through
-        the virtual scroll container. The grid only renders ~30 rows at a
-        time, so we scroll down incrementally to render and capture all rows,
-        deduplicating by invoice_id."""
-        try:
-            all_invoices = {}  # keyed by invoice_id to deduplicate
-            max_scroll_iterations = 200  # safety limit
-
-            # Initial scrape of visible rows
-            result = self._scrape_visible_dojo_rows()
-            debug = result.get('debug', {})
-            logger.info(f"Dojo DataGrid initial scrape: {debug}")
-
-            for inv in result.get('invoices', []):
-                all_invoices[inv['invoice_id']] = inv
-
-            logger.info(f"Initial visible rows: {len(result.get('invoices', []))} invoices "
-                        f"({len(all_invoices)} unique)")
-
-            # Scroll loop: scroll the .dojoxGridScrollbox container down
-            for scroll_iter in range(max_scroll_iterations):
-                # Scroll down by one viewport height within the grid scrollbox
-                scroll_result = self.page.evaluate('''() => {
-                    // Find the scrollbox container(s) - pick the one with scrollable content
-                    const scrollboxes = document.querySelectorAll('.dojoxGridScrollbox');
-                    for (const sb of scrollboxes) {
-                        if (sb.scrollHeight > sb.clientHeight) {
-                            const prevTop = sb.scrollTop;
-                            sb.scrollTop += sb.clientHeight - 20;
-                            return {
-                                scrolled: sb.scrollTop !== prevTop,
-                                scrollTop: sb.scrollTop,
-                                clientHeight: sb.clientHeight,
-                                scrollHeight: sb.scrollHeight,
-                                atBottom: (sb.scrollTop + sb.clientHeight) >= (sb.scrollHeight - 5)
-                            };
-                        }
+    def _iter_dojo_invoices(self) -> Iterator[Dict]:
+        """Yield each invoice in the Dojo DataGrid once, as it is first seen.
+        The grid only renders ~30 rows at a time, so we scroll the virtual
+        scroll container down incrementally to render all rows; only the
+        seen invoice IDs are kept for deduplication."""
+        seen = set()  # invoice IDs already yielded
+        max_scroll_iterations = 200  # safety limit
+
+        # Initial scrape of visible rows
+        result = self._scrape_visible_dojo_rows()
+        debug = result.get('debug', {})
+        logger.info(f"Dojo DataGrid initial scrape: {debug}")
+
+        for inv in result.get('invoices', []):
+            if inv['invoice_id'] not in seen:
+                seen.add(inv['invoice_id'])
+                yield inv
+
+        logger.info(f"Initial visible rows: {len(result.get('invoices', []))} invoices "
+                    f"({len(seen)} unique)")
+
+        # Scroll loop: scroll the .dojoxGridScrollbox container down
+        for scroll_iter in range(max_scroll_iterations):
+            # Scroll down by one viewport height within the grid scrollbox
+            scroll_result = self.page.evaluate('''() => {
+                // Find the scrollbox container(s) - pick the one with scrollable content
+                const scrollboxes = document.querySelectorAll('.dojoxGridScrollbox');
+                for (const sb of scrollboxes) {
+                    if (sb.scrollHeight > sb.clientHeight) {
+                        // Snapshot for the re-render wait below
+                        window.__ddsGridScroll = { box: sb, text: sb.textContent };
+                        const prevTop = sb.scrollTop;
+                        sb.scrollTop += sb.clientHeight - 20;
+                        return {
+                            scrolled: sb.scrollTop !== prevTop,
+                            scrollTop: sb.scrollTop,
+                            clientHeight: sb.clientHeight,
+                            scrollHeight: sb.scrollHeight,
+                            atBottom: (sb.scrollTop + sb.clientHeight) >= (sb.scrollHeight - 5)
+                        };
                     }
-                    return { scrolled: false, atBottom: true, noScrollbox: true };
-                }''')
-
-                if not scroll_result.get('scrolled', False):
-                    logger.info(f"Scroll loop done: no more scrolling possible "
-                                f"(iter {scroll_iter + 1})")
-                    break
-
-                # Wait for virtual rows to re-render after scroll
-                time.sleep(1.0)
+                }
+                return { scrolled: false, atBottom: true, noScrollbox: true };
+            }''')
 
-                # Scrape newly visible rows
-                result = self._scrape_visible_dojo_rows()
-                new_count = 0
-                for inv in result.get('invoices', []):
-                    if inv['invoice_id'] not in all_invoices:
-                        all_invoices[inv['invoice_id']] = inv
-                        new_count += 1
+            if not scroll_result.get('scrolled', False):
+                logger.info(f"Scroll loop done: no more scrolling possible "
+                            f"(iter {scroll_iter + 1})")
+                break
 
-                if scroll_iter % 10 == 0 or new_count > 0:
-                    logger.info(f"Scroll iter {scroll_iter + 1}: "
-                                f"+{new_count} new invoices, "
-                                f"{len(all_invoices)} total unique, "
-                                f"scrollTop={scroll_result.get('scrollTop', '?')}/"
-                                f"{scroll_result.get('scrollHeight', '?')}")
+            # Wait for virtual rows to re-render after scroll: two frames
+            # and the scrollbox's text changed, or 1 s at most
+            self.page.evaluate('''(ms) => new Promise((resolve) => {
+                const snap = window.__ddsGridScroll;
+                const timer = setTimeout(() => resolve(false), ms);
+                let frames = 0;
+                const tick = () => {
+                    if (++frames >= 2 && (!snap || snap.box.textContent !== snap.text)) {
+                        clearTimeout(timer);
+                        resolve(true);
+                    } else {
+                        requestAnimationFrame(tick);
+                    }
+                };
+                requestAnimationFrame(tick);
+            })''', 1000)
 
-                # Stop if we've reached the bottom
-                if scroll_result.get('atBottom', False):
-                    logger.info(f"Reached bottom of grid after {scroll_iter + 1} scroll(s)")
-                    break
+            # Scrape newly visible rows
+            result = self._scrape_visible_dojo_rows()
+            new_count = 0
+            for inv in result.get('invoices', []):
+                if inv['invoice_id'] not in seen:
+                    seen.add(inv['invoice_id'])
+                    new_count += 1
+                    yield inv
+
+            if scroll_iter % 10 == 0 or new_count > 0:
+                logger.info(f"Scroll iter {scroll_iter + 1}: "
+                            f"+{new_count} new invoices, "
+                            f"{len(seen)} total unique, "
+                            f"scrollTop={scroll_result.get('scrollTop', '?')}/"
+                            f"{scroll_result.get('scrollHeight', '?')}")
+
+            # Stop if we've reached the bottom
+            if scroll_result.get('atBottom', False):
+                logger.info(f"Reached bottom of grid after {scroll_iter + 1} scroll(s)")
+                break
 
-            invoices = list(all_invoices.values())
+    def _scrape_invoices_from_dojo_grid(self) -> list:
+        """Scrape ALL invoice data from Dojo DataGrid by scrolling through
+        the virtual scroll container (see _iter_dojo_invoices)."""
+        try:
+            invoices = list(self._iter_dojo_invoices())
             logger.info(f"Dojo DataGrid total: {len(invoices)} unique invoices "
                         f"(after scroll + dedup)")
             return invoices
 
         except Exception as e:
-            logger.error(f"Dojo DataGrid invoice scrape failed: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Dojo DataGrid invoice scrape failed: {e}")
             return []
 
     def _click_next_page(self) -> bool:
         """Click next page button if available, return True if successful"""
         try:
-            # Try common pagination patterns
-            result = self.page.evaluate('''() => {
-                // Look for Next button or > arrow
-                const nextSelectors = [
-                    'a:contains("Next")', 'input[value="Next"]', 'button:contains("Next")',
-                    'a:contains(">")', 'button:contains(">")',
-                    '[class*="next"]', '[aria-label*="next" i]',
-                    'a.next', 'li.next a'
-                ];
-
-                // Try each selector
-                for (const sel of nextSelectors) {
-                    try {
-                        const el = document.querySelector(sel);
-                        if (el && !el.disabled && el.offsetParent !== null) {
+            # Try common pagination patterns; returns null if there is no
+            # next control, else the first invoice ID shown before the click
+            first_id = self.page.evaluate('''() => {
+                const usable = (el) => !el.disabled && el.offsetParent !== null;
+                const cells = document.querySelectorAll('td, .dojoxGridCell');
+                let firstId = '';
+                for (let i = 0; i < cells.length; i++) {
+                    const t = (cells[i].textContent || '').trim();
+                    if (/^\\d{7}$/.test(t)) { firstId = t; break; }
+                }
+
+                // Look for a Next button or > arrow by its text; inputs by value
+                const labels = new Set(['Next', '>', '>>']);
+                for (const tag of ['a', 'button', 'input']) {
+                    const els = document.getElementsByTagName(tag);
+                    for (let i = 0; i < els.length; i++) {
+                        const el = els[i];
+                        const text = (tag === 'input' ? el.value : el.textContent || '').trim();
+                        if (labels.has(text) && usable(el)) {
                             el.click();
-                            return true;
+                            return firstId;
                         }
-                    } catch(e) {}
+                    }
                 }
 
-                // Try finding by text content
-                const links = document.querySelectorAll('a, button, input[type="button"]');
-                for (const link of links) {
-                    const text = (link.value || link.innerText || '').trim();
-                    if (text === 'Next' || text === '>' || text === '>>') {
-                        if (!link.disabled && link.offsetParent !== null) {
-                            link.click();
-                            return true;
-                        }
+                // Icon-only pagers: class / aria-label conventions
+                for (const el of document.querySelectorAll(
+                        '[class*="next"], [aria-label*="next" i], a.next, li.next a')) {
+                    if (usable(el)) {
+                        el.click();
+                        return firstId;
                     }
                 }
 
-                return false;
+                return null;
             }''')
 
-            if result:
-                time.sleep(2)
-                self.page.wait_for_load_state("networkidle")
-                return True
-            return False
+            if first_id is None:
+                return False
+            # The next page is in once the first invoice ID changes
+            try:
+                self.page.wait_for_function(
+                    '''prev => {
+                        const cells = document.querySelectorAll('td, .dojoxGridCell');
+                        for (let i = 0; i < cells.length; i++) {
+                            const t = (cells[i].textContent || '').trim();
+                            if (/^\\d{7}$/.test(t)) return t !== prev;
+                        }
+                        return false;
+                    }''', arg=first_id, timeout=10000, polling=100)
+            except Exception:
+                logger.debug("Invoice rows did not change after clicking next page")
+            return True
 
         except Exception as e:
             logger.debug(f"No next page: {e}")
@@ -1280,6 +1477,7 @@ class DDSeBillingBot:
         Returns complete list of available invoices on the portal.
         """
         all_invoices = []
+        seen_ids = set()  # invoice IDs in all_invoices, for the loop-back check
         page_num = 1
         max_pages = 50  # Safety limit
 
@@ -1316,11 +1514,12 @@ class DDSeBillingBot:
             # Check for duplicates (indicates we've looped back)
             if all_invoices and page_invoices:
                 first_new_id = page_invoices[0].get('invoice_id', '')
-                if any(inv.get('invoice_id') == first_new_id for inv in all_invoices):
+                if first_new_id in seen_ids:
                     logger.info("Detected duplicate invoices, stopping pagination")
                     break
 
             all_invoices.extend(page_invoices)
+            seen_ids.update(inv.get('invoice_id') for inv in page_invoices)
             logger.info(f"Page {page_num}: Found {len(page_invoices)} invoices (total: {len(all_invoices)})")
 
             # Try to go to next page
@@ -1331,18 +1530,10 @@ class DDSeBillingBot:
             page_num += 1
             time.sleep(1)
 
+        self._search_page = page_num
         logger.info(f"=== Invoice Inventory Complete: {len(all_invoices)} invoices across {page_num} page(s) ===")
         return all_invoices
 
-    def _normalize_month(self, month_str: str) -> str:
-        """Normalize month format: '8/2025' -> '08/2025'"""
-        if not month_str:
-            return ''
-        parts = month_str.split('/')
-        if len(parts) == 2:
-            return parts[0].zfill(2) + '/' + parts[1]
-        return month_str
-
     def match_records_to_inventory(
         self,
         records: List[Dict],
@@ -1358,36 +1549,39 @@ class DDSeBillingBot:
         matchable = []
         unmatched = []
 
-        # Create lookup structures for efficient matching
-        # Key: (svc_code, normalized_month) -> list of inventory items
+        # Create lookup structures for efficient matching (one pass)
+        # Key: (svc_code, month_key) -> list of inventory items
+        # Also a (uci, month_key) lookup for direct matches, and the
+        # keys that have a multi-consumer invoice (empty UCI)
         inventory_by_key = defaultdict(list)
-        for inv in inventory:
-            key = (inv.get('svc_code', ''), self._normalize_month(inv.get('svc_month', '')))
-            inventory_by_key[key].append(inv)
-
-        # Also create UCI lookup for direct matches
         inventory_by_uci = {}
+        multi_consumer_keys = set()
         for inv in inventory:
+            month = _month_key(inv.get('svc_month', ''))
+            key = (inv.get('svc_code', ''), month)
+            inventory_by_key[key].append(inv)
+            if not inv.get('has_uci', True):
+                multi_consumer_keys.add(key)
             uci = inv.get('uci', '')
             if uci:
-                month = self._normalize_month(inv.get('svc_month', ''))
                 inventory_by_uci[(uci, month)] = inv
 
         for record in records:
             svc_code = record.get('svc_code', '')
-            service_month = self._normalize_month(record.get('service_month', ''))
+            month = _month_key(record.get('service_month', ''))
             uci = record.get('uci', '')
             consumer_name = record.get('consumer_name', '')
 
             # Method 1: Direct UCI + month match
-            if (uci, service_month) in inventory_by_uci:
+            if (uci, month) in inventory_by_uci:
                 matchable.append(record)
                 logger.debug(f"  ✓ Direct match: {consumer_name} (UCI: {uci})")
                 continue
 
             # Method 2: Check by service code + month (for multi-consumer invoices)
-            key = (svc_code, service_month)
+            key = (svc_code, month)
             matching_invoices = inventory_by_key.get(key, [])
+            service_month = _normalize_month(record.get('service_month', ''))  # for messages
 
             if not matching_invoices:
                 # No invoice for this service code + month
@@ -1397,14 +1591,8 @@ class DDSeBillingBot:
                 continue
 
             # Check for multi-consumer invoice (empty UCI means it could contain this consumer)
-            found_multi_consumer = False
-            for inv in matching_invoices:
-                if not inv.get('has_uci', True):  # Empty UCI = multi-consumer invoice
-                    found_multi_consumer = True
-                    record['_is_multi_consumer'] = True
-                    break
-
-            if found_multi_consumer:
+            if key in multi_consumer_keys:
+                record['_is_multi_consumer'] = True
                 matchable.append(record)
                 logger.debug(f"  ✓ Multi-consumer match: {consumer_name} (UCI: {uci})")
             else:
@@ -1416,6 +1604,33 @@ class DDSeBillingBot:
         logger.info(f"Matching complete: {len(matchable)} matchable, {len(unmatched)} unmatched")
         return matchable, unmatched
 
+    def _invoice_cache_key(self, svc_code: str, svc_month_year: str, invoice_id: str = '') -> str:
+        """
+        Multi-consumer cache key: the invoice_id when known, else
+        'svc_code|MM/YYYY' (or the invoice_id an earlier call saw for it)
+        """
+        alias = f"{svc_code}|{_normalize_month(svc_month_year or '')}"
+        if invoice_id:
+            self._invoice_aliases[alias] = invoice_id
+            return invoice_id
+        return self._invoice_aliases.get(alias, alias)
+
+    def _cached_consumers(self, key: str) -> Optional[List[Dict]]:
+        """Cached consumer lines for key, or None"""
+        consumers = self._multi_consumer_cache.get(key)
+        if consumers is not None:
+            self._multi_consumer_cache.move_to_end(key)
+        return consumers
+
+    def _cache_consumers(self, key: str, consumers: List[Dict]):
+        """Store consumer lines for key, evicting the least recently used invoice"""
+        self._multi_consumer_cache[key] = consumers
+        self._multi_consumer_cache.move_to_end(key)
+        if len(self._multi_consumer_cache) > MULTI_CONSUMER_CACHE_SIZE:
+            evicted, _ = self._multi_consumer_cache.popitem(last=False)
+            for alias in [a for a, k in self._invoice_aliases.items() if k == evicted]:
+                del self._invoice_aliases[alias]
+
     def expand_multi_consumer_folder(self, folder_inv: Dict) -> List[Dict]:
         """
         Click into a multi-consumer invoice folder and scrape individual invoices inside.
@@ -1429,9 +1644,9 @@ class DDSeBillingBot:
             logger.info(f"Expanding folder: Invoice {invoice_id}, SVC={svc_code}, Month={svc_month}")
 
             # Check cache first to avoid unnecessary click
-            if invoice_id and invoice_id in self._multi_consumer_cache:
+            consumers = self._cached_consumers(self._invoice_cache_key(svc_code, svc_month, invoice_id))
+            if consumers is not None:
                 logger.info(f"Using cached contents for invoice {invoice_id}")
-                consumers = self._multi_consumer_cache[invoice_id]
             else:
                 # Click EDIT on this folder row to open it
                 if not self.open_invoice_details(None, service_month_year=svc_month, svc_code=svc_code, invoice_id=invoice_id):
@@ -1444,11 +1659,10 @@ class DDSeBillingBot:
             # Convert to inventory format
             invoices = []
             for c in consumers:
-                name_words = c.get('consumer_name', '').strip().split()
                 invoices.append({
                     'invoice_id': invoice_id,
-                    'last_name': ' '.join(name_words[:-1]) if len(name_words) > 1 else (name_words[0] if name_words else ''),
-                    'first_name': name_words[-1] if len(name_words) > 1 else '',
+                    'last_name': c['last_name'],
+                    'first_name': c['first_name'],
                     'uci': c.get('uci', ''),
                     'service_month': svc_month,
                     'svc_code': c.get('svc_code', svc_code),
@@ -1468,47 +1682,50 @@ class DDSeBillingBot:
         Scrape the currently open invoice view to cache all consumer lines.
         Called when we first enter a multi-consumer invoice to remember what's inside.
 
-        Returns list of dicts: {line_number, consumer_name, uci, svc_code, svc_subcode, auth_number}
+        Returns list of dicts: {line_number, consumer_name, last_name, first_name, uci, svc_code, svc_subcode, auth_number}
         """
         try:
-            invoice_key = invoice_id or (svc_code, svc_month_year)
+            invoice_key = self._invoice_cache_key(svc_code, svc_month_year, invoice_id)
 
             # Check if already cached
-            if invoice_key in self._multi_consumer_cache:
+            cached = self._cached_consumers(invoice_key)
+            if cached is not None:
                 logger.info(f"Using cached contents for invoice {invoice_key}")
-                return self._multi_consumer_cache[invoice_key]
+                return cached
 
             logger.info(f"Caching multi-consumer invoice contents: invoice_id={invoice_id}, SVC={svc_code}, Month={svc_month_year}")
 
-            # Diagnostic: dump body text to check for missing consumer names
-            page_diag = self.page.evaluate('''() => {
-                const body = document.body.innerText || '';
-                // Check for iframes with content
-                const iframes = document.querySelectorAll('iframe');
-                let iframeInfo = [];
-                for (const iframe of iframes) {
-                    try {
-                        const doc = iframe.contentDocument;
-                        if (doc) {
-                            const trs = doc.querySelectorAll('tr');
-                            iframeInfo.push({src: iframe.src, trCount: trs.length, bodyLen: (doc.body?.innerText || '').length});
-                        }
-                    } catch(e) { iframeInfo.push({src: iframe.src, error: e.message}); }
-                }
-                // Get all text after "Filter All" to see consumer table content
-                const filterIdx = body.indexOf('Filter All');
-                const tableText = filterIdx >= 0 ? body.substring(filterIdx, filterIdx + 3000) : '';
-                return {
-                    iframes: iframeInfo,
-                    bodyLength: body.length,
-                    tableTextAfterFilter: tableText
-                };
-            }''')
-            logger.info(f"Invoice detail diag: bodyLen={page_diag.get('bodyLength')}, iframes={page_diag.get('iframes')}")
-            table_text = page_diag.get('tableTextAfterFilter', '')
-            if table_text and len(table_text) > 500:
-                logger.info(f"Table text (first 1500 chars): {table_text[:1500]}")
-                logger.info(f"Table text (last 500 chars): {table_text[-500:]}")
+            # Diagnostic: dump body text to check for missing consumer names.
+            # Stringifies the whole document, so only when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                page_diag = self.page.evaluate('''() => {
+                    const body = (document.body.textContent || '').replace(/\\s+/g, ' ');
+                    // Check for iframes with content
+                    const iframes = document.querySelectorAll('iframe');
+                    let iframeInfo = [];
+                    for (const iframe of iframes) {
+                        try {
+                            const doc = iframe.contentDocument;
+                            if (doc) {
+                                const trs = doc.querySelectorAll('tr');
+                                iframeInfo.push({src: iframe.src, trCount: trs.length, bodyLen: (doc.body?.textContent || '').length});
+                            }
+                        } catch(e) { iframeInfo.push({src: iframe.src, error: e.message}); }
+                    }
+                    // Get all text after "Filter All" to see consumer table content
+                    const filterIdx = body.indexOf('Filter All');
+                    const tableText = filterIdx >= 0 ? body.substring(filterIdx, filterIdx + 3000) : '';
+                    return {
+                        iframes: iframeInfo,
+                        bodyLength: body.length,
+                        tableTextAfterFilter: tableText
+                    };
+                }''')
+                logger.debug(f"Invoice detail diag: bodyLen={page_diag.get('bodyLength')}, iframes={page_diag.get('iframes')}")
+                table_text = page_diag.get('tableTextAfterFilter', '')
+                if table_text and len(table_text) > 500:
+                    logger.debug(f"Table text (first 1500 chars): {table_text[:1500]}")
+                    logger.debug(f"Table text (last 500 chars): {table_text[-500:]}")
 
             # Scrape all consumer lines with scroll loop to handle pages that
             # lazy-render rows (e.g. Invoice 2610388 with 30 consumers only
@@ -1518,57 +1735,7 @@ class DDSeBillingBot:
             max_scroll_iters = 20
 
             for scroll_iter in range(max_scroll_iters + 1):
-                consumers = self.page.evaluate('''() => {
-                    const results = [];
-                    const skipped = [];
-                    const rows = document.querySelectorAll('tr');
-
-                    for (const row of rows) {
-                        const cells = row.querySelectorAll('td');
-                        if (cells.length < 6) continue;
-
-                        // Find Line# column - it's a small integer (1, 2, 3...)
-                        let lineIdx = -1;
-                        for (let i = 0; i < Math.min(cells.length, 3); i++) {
-                            const text = cells[i]?.innerText?.trim() || '';
-                            if (/^\\d{1,3}$/.test(text) && parseInt(text) < 100) {
-                                lineIdx = i;
-                                break;
-                            }
-                        }
-
-                        if (lineIdx === -1) {
-                            // Log first 3 cells for rows with 6+ cells that don't match
-                            const preview = Array.from(cells).slice(0, 4).map(c => c.innerText?.trim()?.substring(0, 30) || '');
-                            if (preview.some(p => p.length > 0)) {
-                                skipped.push({reason: 'no_line_idx', cellCount: cells.length, preview: preview});
-                            }
-                            continue;
-                        }
-
-                        const lineNum = cells[lineIdx]?.innerText?.trim() || '';
-                        const consumerName = cells[lineIdx + 1]?.innerText?.trim() || '';
-                        const uci = cells[lineIdx + 2]?.innerText?.trim() || '';
-                        const svcCode = cells[lineIdx + 3]?.innerText?.trim() || '';
-                        const svcSubcode = cells[lineIdx + 4]?.innerText?.trim() || '';
-                        const authNumber = cells[lineIdx + 5]?.innerText?.trim() || '';
-
-                        if (lineNum && /^\\d+$/.test(lineNum) && /^\\d+$/.test(uci) && /[a-zA-Z]/.test(consumerName)) {
-                            results.push({
-                                line_number: parseInt(lineNum),
-                                consumer_name: consumerName,
-                                uci: uci,
-                                svc_code: svcCode,
-                                svc_subcode: svcSubcode,
-                                auth_number: authNumber
-                            });
-                        } else {
-                            skipped.push({reason: 'validation', lineNum, consumerName: consumerName.substring(0, 30), uci, cellCount: cells.length});
-                        }
-                    }
-                    return {results, skipped};
-                }''')
-
+                consumers = self._scrape_consumer_lines()
                 batch = consumers.get('results', [])
                 new_count = 0
                 for c in batch:
@@ -1650,7 +1817,7 @@ class DDSeBillingBot:
                 for s in all_skipped[:10]:
                     logger.info(f"  Skipped: {s}")
 
-            self._multi_consumer_cache[invoice_key] = consumers_list
+            self._cache_consumers(invoice_key, consumers_list)
             logger.info(f"Cached {len(consumers_list)} consumer lines for invoice {invoice_key}")
             for c in consumers_list:
                 logger.info(f"  Line {c['line_number']}: {c['consumer_name']} (UCI: {c['uci']})")
@@ -1661,6 +1828,47 @@ class DDSeBillingBot:
             logger.error(f"Failed to cache multi-consumer invoice contents: {e}")
             return []
 
+    def _scrape_consumer_lines(self) -> Dict[str, List[Dict]]:
+        """
+        Consumer lines of the open invoice view, from the row snapshot:
+        {'results': [{line_number, consumer_name, last_name, first_name, uci,
+        svc_code, svc_subcode, auth_number}], 'skipped': [...]}
+        """
+        results = []
+        skipped = []
+        for row in self._snapshot_rows():
+            cells = row['cells']
+
+            # Find Line# column - it's a small integer (1, 2, 3...)
+            line_idx = next((i for i in range(min(len(cells), 3))
+                             if _LINE_NUMBER_RE.match(cells[i]) and int(cells[i]) < 100), -1)
+            if line_idx == -1:
+                # Log first cells for rows with 6+ cells that don't match
+                preview = [c[:30] for c in cells[:4]]
+                if any(preview):
+                    skipped.append({'reason': 'no_line_idx', 'cellCount': len(cells), 'preview': preview})
+                continue
+
+            line_num, consumer_name, uci, svc_code, svc_subcode, auth_number = (
+                cells[line_idx:line_idx + 6] + [''] * 6)[:6]
+            if line_num.isdigit() and uci.isdigit() and _HAS_LETTER_RE.search(consumer_name):
+                # "LAST [MORE LAST] FIRST": last word is the first name
+                *last_words, first_name = consumer_name.split()
+                results.append({
+                    'line_number': int(line_num),
+                    'consumer_name': consumer_name,
+                    'last_name': ' '.join(last_words) if last_words else first_name,
+                    'first_name': first_name if last_words else '',
+                    'uci': uci,
+                    'svc_code': svc_code,
+                    'svc_subcode': svc_subcode,
+                    'auth_number': auth_number,
+                })
+            else:
+                skipped.append({'reason': 'validation', 'lineNum': line_num,
+                                'consumerName': consumer_name[:30], 'uci': uci, 'cellCount': len(cells)})
+        return {'results': results, 'skipped': skipped}
+
     def open_invoice_details(self, consumer_name: str, service_month_year: str = None, uci: str = None, svc_code: str = None, invoice_id: str = None) -> bool:
         """
         Click EDIT to open invoice details, matching by UCI + Service Code + Service M/Y.
@@ -1668,178 +1876,32 @@ class DDSeBillingBot:
         """
         try:
             logger.info(f"Opening invoice: Invoice={invoice_id}, UCI={uci}, SVC={svc_code}, Month={service_month_year}")
-            self._screenshot("09_before_edit_click")
 
-            clicked = False
-
-            # Method 0: Match by invoice_id (most precise — used by folder expansion)
-            if invoice_id:
-                result = self.page.evaluate(f'''() => {{
-                    // Try standard HTML <tr> rows first
-                    const rows = document.querySelectorAll('tr');
-                    for (const row of rows) {{
-                        const cells = row.querySelectorAll('td');
-                        if (cells.length < 6) continue;
-                        const rowInvoiceId = cells[1]?.innerText?.trim() || '';
-                        if (rowInvoiceId === '{invoice_id}') {{
-                            const editLink = row.querySelector('a[href*="edit"], a img, img[src*="edit"]');
-                            if (editLink) {{
-                                editLink.click();
-                                return 'clicked invoice ' + rowInvoiceId;
-                            }}
-                            const lastCell = cells[cells.length - 1];
-                            const editInLast = lastCell.querySelector('a, img');
-                            if (editInLast) {{
-                                editInLast.click();
-                                return 'clicked invoice ' + rowInvoiceId + ' via last cell';
-                            }}
-                        }}
-                    }}
-
-                    // Try Dojo DataGrid: rows split across multiple views
-                    const views = document.querySelectorAll('.dojoxGridView');
-                    if (views.length > 0) {{
-                        // Find which row index contains our invoice_id
-                        let targetIdx = -1;
-                        for (const view of views) {{
-                            const dRows = view.querySelectorAll(
-                                '.dojoxGridContent .dojoxGridRow, .dojoxGridScrollbox .dojoxGridRow'
-                            );
-                            for (let r = 0; r < dRows.length; r++) {{
-                                const cells = dRows[r].querySelectorAll('.dojoxGridCell');
-                                for (const cell of cells) {{
-                                    if ((cell.innerText || '').trim() === '{invoice_id}') {{
-                                        targetIdx = r;
-                                        break;
-                                    }}
-                                }}
-                                if (targetIdx >= 0) break;
-                            }}
-                            if (targetIdx >= 0) break;
-                        }}
-
-                        if (targetIdx >= 0) {{
-                            // Find the edit button at this row index in any view
-                            for (const view of views) {{
-                                const dRows = view.querySelectorAll(
-                                    '.dojoxGridContent .dojoxGridRow, .dojoxGridScrollbox .dojoxGridRow'
-                                );
-                                if (targetIdx < dRows.length) {{
-                                    const row = dRows[targetIdx];
-                                    const editImg = row.querySelector('img[src*="edit" i]')
-                                        || row.querySelector('a[href*="edit"] img')
-                                        || row.querySelector('a img');
-                                    if (editImg) {{
-                                        editImg.click();
-                                        return 'clicked dojo invoice {invoice_id} at row ' + targetIdx;
-                                    }}
-                                }}
-                            }}
-                        }}
-                    }}
-
-                    return 'no match for invoice_id {invoice_id}';
-                }}''')
-                logger.info(f"Invoice ID match result: {result}")
-                clicked = 'clicked' in result
-
-            # Method 1: Find row matching UCI + Service Code + Service M/Y (single-consumer invoice)
-            if not clicked and uci and service_month_year:
-                svc = svc_code or ''
-                result = self.page.evaluate(f'''() => {{
-                    // Normalize month format: "8/2025" -> "08/2025"
-                    const normalizeMonth = (m) => {{
-                        if (!m) return '';
-                        const parts = m.split('/');
-                        if (parts.length === 2) {{
-                            return parts[0].padStart(2, '0') + '/' + parts[1];
-                        }}
-                        return m;
-                    }};
-                    const targetMonth = normalizeMonth('{service_month_year}');
-
-                    const rows = document.querySelectorAll('tr');
-                    for (const row of rows) {{
-                        const cells = row.querySelectorAll('td');
-                        if (cells.length < 6) continue;
-
-                        // Table: [0]Checkbox, [1]Invoice#, [2]Service Code, [3]Service M/Y, [4]UCI#, [5]Consumer Name, ...
-                        const rowSvcCode = cells[2]?.innerText?.trim() || '';
-                        const rowMonth = normalizeMonth(cells[3]?.innerText?.trim() || '');
-                        const rowUci = cells[4]?.innerText?.trim() || '';
-
-                        // Match all three: UCI, Service Code, Service M/Y
-                        const matchesUci = rowUci === '{uci}';
-                        const matchesMonth = rowMonth === targetMonth;
-                        const matchesSvc = !'{svc}' || rowSvcCode === '{svc}' || rowSvcCode.startsWith('{svc}');
-
-                        if (matchesUci && matchesMonth && matchesSvc) {{
-                            const editLink = row.querySelector('a[href*="edit"], a img, img[src*="edit"]');
-                            if (editLink) {{
-                                editLink.click();
-                                return 'clicked single-consumer: UCI={uci}, Month={service_month_year}';
-                            }}
-                            const lastCell = cells[cells.length - 1];
-                            const editInLast = lastCell.querySelector('a, img');
-                            if (editInLast) {{
-                                editInLast.click();
-                                return 'clicked edit in last cell';
-                            }}
-                        }}
-                    }}
-                    return 'no direct match';
-                }}''')
-                logger.info(f"Direct match result: {result}")
-                clicked = 'clicked' in result
-
-            # Method 2: Try multi-consumer invoice (no UCI in search, match by Service Code + Month)
-            if not clicked and service_month_year:
-                svc = svc_code or ''
-                result = self.page.evaluate(f'''() => {{
-                    // Normalize month format: "8/2025" -> "08/2025"
-                    const normalizeMonth = (m) => {{
-                        if (!m) return '';
-                        const parts = m.split('/');
-                        if (parts.length === 2) {{
-                            return parts[0].padStart(2, '0') + '/' + parts[1];
-                        }}
-                        return m;
-                    }};
-                    const targetMonth = normalizeMonth('{service_month_year}');
-
-                    const rows = document.querySelectorAll('tr');
-                    for (const row of rows) {{
-                        const cells = row.querySelectorAll('td');
-                        if (cells.length < 6) continue;
-
-                        // Table: [0]Checkbox, [1]Invoice#, [2]Service Code, [3]Service M/Y, [4]UCI#, [5]Consumer Name, ...
-                        const rowSvcCode = cells[2]?.innerText?.trim() || '';
-                        const rowMonth = normalizeMonth(cells[3]?.innerText?.trim() || '');
-                        const rowUci = cells[4]?.innerText?.trim() || '';
-
-                        // Multi-consumer: UCI is empty, but Service Code + Month match
-                        const isMultiConsumer = !rowUci || rowUci === '';
-                        const matchesMonth = rowMonth === targetMonth;
-                        const matchesSvc = !'{svc}' || rowSvcCode === '{svc}' || rowSvcCode.startsWith('{svc}');
-
-                        if (isMultiConsumer && matchesMonth && matchesSvc) {{
-                            const editLink = row.querySelector('a[href*="edit"], a img, img[src*="edit"]');
-                            if (editLink) {{
-                                editLink.click();
-                                return 'clicked multi-consumer: Month={service_month_year}';
-                            }}
-                            const lastCell = cells[cells.length - 1];
-                            const editInLast = lastCell.querySelector('a, img');
-                            if (editInLast) {{
-                                editInLast.click();
-                                return 'clicked multi-consumer edit';
-                            }}
-                        }}
-                    }}
-                    return 'no multi-consumer match';
-                }}''')
-                logger.info(f"Multi-consumer match result: {result}")
-                clicked = 'clicked' in result
+            # Already showing this invoice (e.g. back from its calendar)
+            if (invoice_id and invoice_id == self._open_invoice_id
+                    and self.page.evaluate(f"() => {INVOICE_VIEW_JS}")):
+                logger.info(f"Invoice {invoice_id} is already open")
+                return True
+
+            self._screenshot("09_before_edit_click")
+            dom_hash = self._dom_hash()
+
+            # Methods 0-2 in one pass over the results rows (see
+            # __dds.openInvoice): invoice_id (most precise — used by folder
+            # expansion), then UCI + Service Code + Service M/Y
+            # (single-consumer), then Service Code + Month on a row without
+            # UCI (multi-consumer)
+            result = self.page.evaluate("args => window.__dds.openInvoice(args)", {
+                'invoiceId': invoice_id or '',
+                'uci': uci or '',
+                'svc': svc_code or '',
+                'month': service_month_year or '',
+            })
+            clicked = bool(result)
+            if clicked:
+                logger.info(f"Opened invoice by {result['method']} match: {result['detail']}")
+            else:
+                logger.info("No invoice row matched by invoice_id, UCI or multi-consumer")
 
             # Method 3: Fall back to first EDIT link
             if not clicked:
@@ -1854,9 +1916,10 @@ class DDSeBillingBot:
                     except:
                         continue
 
-            time.sleep(2)
-            self.page.wait_for_load_state("networkidle")
-            time.sleep(2)
+            if clicked and self._wait_for_dom_change(dom_hash):
+                self._wait_ready(INVOICE_VIEW_JS)
+            # Only an invoice_id match is known to have opened that invoice
+            self._open_invoice_id = invoice_id if result and result['method'] in ('invoice', 'dojo') else None
             self._screenshot("10_after_edit_click")
 
             logger.info(f"Current URL after edit click: {self.page.url}")
@@ -1874,53 +1937,34 @@ class DDSeBillingBot:
             self._screenshot("11_before_calendar_click")
 
             # Find the row by UCI and click on Days Attend column
-            # Days Attend is typically column 8 (0-indexed) based on the table structure
-            clicked = self.page.evaluate(f'''() => {{
-                const rows = document.querySelectorAll('tr');
-                for (const row of rows) {{
-                    const text = row.innerText;
-                    // Match by UCI number
-                    if (text.includes('{uci}')) {{
-                        const cells = row.querySelectorAll('td');
-                        // Days Attend column - try clicking it (usually column 8)
-                        // The header row shows: Line#, Consumer, UCI#, SVC Code, SVC Subcode, Auth#, Auth Date, Unit Type, Units Billed, Days Attend, ...
-                        if (cells.length >= 9) {{
-                            // Days Attend is around index 8-9
-                            for (let i = 7; i < Math.min(cells.length, 12); i++) {{
-                                const cell = cells[i];
-                                // Click on the Days Attend cell (it will be a number or link)
-                                const link = cell.querySelector('a');
-                                if (link) {{
-                                    link.click();
-                                    return 'clicked link in column ' + i;
-                                }}
-                            }}
-                            // If no link found, try clicking cell 8 directly
-                            if (cells[8]) {{
-                                cells[8].click();
-                                return 'clicked cell 8';
-                            }}
-                        }}
-                    }}
-                }}
-                return 'not found';
-            }}''')
+            # The header row shows: Line#, Consumer, UCI#, SVC Code, SVC Subcode, Auth#, Auth Date, Unit Type, Units Billed, Days Attend, ...
+            # Days Attend is around index 8-9: click the first link in columns
+            # 7-11 (it will be a number or link), else cell 8 directly
+            clicked = 'not found'
+            dom_hash = self._dom_hash()
+            for row in self._snapshot_rows():
+                if len(row['cells']) >= 9 and uci in ' '.join(row['cells']):
+                    result = self.page.evaluate(
+                        "([i]) => window.__dds.clickRowCell(i, 7, 12, 8)", [row['index']])
+                    if result:
+                        clicked = result
+                        break
 
             logger.info(f"Calendar click result: {clicked}")
-            time.sleep(2)
-            self.page.wait_for_load_state("networkidle")
-            time.sleep(2)
+            if clicked != 'not found' and self._wait_for_dom_change(dom_hash):
+                self._wait_ready(CALENDAR_JS)
             self._screenshot("12_after_calendar_click")
 
             current_url = self.page.url
             logger.info(f"URL after calendar click: {current_url}")
 
             if '/invoices/unitcalendar' in current_url or 'calendar' in current_url.lower():
-                logger.info("Opened calendar page")
+                logger.info(f"Opened calendar page ({len(self._index_calendar())} day inputs)")
                 return True
 
             # Check if page content changed
             if clicked != 'not found':
+                self._index_calendar()
                 return True
 
             logger.warning("May not have opened calendar")
@@ -1934,41 +1978,9 @@ class DDSeBillingBot:
     def enter_service_days(self, service_days: List[int], units_per_day: int = 1) -> bool:
         """Enter units for each service day in the calendar"""
         try:
-            logger.info(f"Entering units for days: {service_days}")
-
-            # The calendar has input fields for each day
-            # Find inputs by their position in the calendar grid
-            for day in service_days:
-                # Find the input field for this day
-                # Calendar inputs are typically identified by day number
-                self.page.evaluate(f'''() => {{
-                    // Find all cells in calendar
-                    const cells = document.querySelectorAll('td');
-                    for (const cell of cells) {{
-                        // Look for cell containing the day number
-                        const daySpan = cell.querySelector('span, div');
-                        const input = cell.querySelector('input[type="text"]');
-
-                        if (input) {{
-                            // Check if this cell is for day {day}
-                            const cellText = cell.innerText.trim();
-                            if (cellText.startsWith('{day}') || cellText === '{day}') {{
-                                input.value = '{units_per_day}';
-                                input.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                return true;
-                            }}
-                        }}
-                    }}
-
-                    // Alternative: find input by looking at day numbers
-                    const allInputs = document.querySelectorAll('input[type="text"]');
-                    // Calendar typically has day numbers followed by input fields
-                    return false;
-                }}''')
-
-            # Wait a moment for form to update
-            time.sleep(1)
-            logger.info(f"Entered units for {len(service_days)} days")
+            logger.info(f"Entering units for days: {service_days}")
+            days_entered, _, _ = self.enter_calendar_units(service_days, units_per_day)
+            logger.info(f"Entered units for {days_entered} days")
             return True
 
         except Exception as e:
@@ -1993,61 +2005,28 @@ class DDSeBillingBot:
             unavailable_days = []
             already_entered_days = []
 
-            for day in service_days:
-                try:
-                    result = self.page.evaluate(f'''() => {{
-                        // Look through all table cells
-                        const cells = document.querySelectorAll('td');
-                        for (const cell of cells) {{
-                            const text = cell.innerText.trim();
-                            const input = cell.querySelector('input');
-
-                            // Check if cell contains our day number and has an input
-                            if (text.includes('{day}') && input) {{
-                                // Make sure it's the right day (not just contains the digit)
-                                const lines = text.split('\\n');
-                                if (lines[0].trim() === '{day}') {{
-                                    // Check if input is disabled/readonly/greyed-out
-                                    if (input.disabled || input.readOnly ||
-                                        input.getAttribute('disabled') !== null ||
-                                        input.getAttribute('readonly') !== null ||
-                                        cell.classList.contains('disabled') ||
-                                        getComputedStyle(input).pointerEvents === 'none' ||
-                                        parseFloat(getComputedStyle(input).opacity) < 0.5) {{
-                                        return 'disabled';
-                                    }}
-                                    // Check if already has a value (prevent overwrite)
-                                    const existingValue = parseFloat(input.value) || 0;
-                                    if (existingValue > 0) {{
-                                        return 'already_entered';
-                                    }}
-                                    // Enter value
-                                    input.value = '{units_per_day}';
-                                    input.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                                    input.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                    return 'success';
-                                }}
-                            }}
-                        }}
-                        return 'not_found';
-                    }}''')
-
-                    if result == 'success':
-                        days_entered += 1
-                        logger.info(f"  Entered unit for day {day}")
-                    elif result == 'already_entered':
-                        already_entered_days.append(day)
-                        logger.info(f"  Day {day} already has a value (skipped)")
-                    elif result == 'disabled':
-                        unavailable_days.append(day)
-                        logger.warning(f"  Day {day} is greyed out/disabled")
-                    else:
-                        unavailable_days.append(day)
-                        logger.warning(f"  Could not find input for day {day}")
+            # One evaluate for the whole month against the stamped inputs;
+            # JSON turns the day keys into strings
+            self._index_calendar()
+            results = self.page.evaluate(
+                "args => window.__dds.enterCalendarUnits(args)",
+                {'days': list(service_days), 'units': units_per_day},
+            )
 
-                except Exception as e:
+            for day in service_days:
+                result = results.get(str(day))
+                if result == 'success':
+                    days_entered += 1
+                    logger.info(f"  Entered unit for day {day}")
+                elif result == 'already_entered':
+                    already_entered_days.append(day)
+                    logger.info(f"  Day {day} already has a value (skipped)")
+                elif result == 'disabled':
+                    unavailable_days.append(day)
+                    logger.warning(f"  Day {day} is greyed out/disabled")
+                else:
                     unavailable_days.append(day)
-                    logger.warning(f"  Error entering day {day}: {e}")
+                    logger.warning(f"  Could not find input for day {day}")
 
             time.sleep(1)
             return days_entered, unavailable_days, already_entered_days
@@ -2056,27 +2035,67 @@ class DDSeBillingBot:
             logger.error(f"Calendar entry failed: {e}")
             return 0, list(service_days), []
 
-    def click_update(self) -> bool:
-        """Click Update button to save calendar entries, then Close to exit"""
+    def click_update(self, save: bool = True) -> bool:
+        """
+        Click Update button to save calendar entries, then Close to exit.
+        With save=False (nothing was entered) only Close is clicked.
+        """
         try:
-            logger.info("Clicking Update...")
-            self._js_click("Update")
-            self.page.wait_for_load_state("networkidle")
-            time.sleep(2)
-            logger.info("Update clicked")
-
-            # Click Close to exit calendar view and return to invoice view
-            logger.info("Clicking Close...")
-            self._js_click("Close")
-            self.page.wait_for_load_state("networkidle")
-            time.sleep(1)
-            logger.info("Close clicked")
-
+            if save:
+                logger.info("Clicking Update...")
+                dom_hash = self._dom_hash()
+                self._js_click("Update")
+                self._await_update(dom_hash)
+            else:
+                logger.info("No new units entered, skipping Update")
+            self._close_calendar()
             return True
         except Exception as e:
             logger.error(f"Update failed: {e}")
             return False
 
+    def _await_update(self, dom_hash: int):
+        """Wait out the save after Update was clicked on a page with this _dom_hash()"""
+        # The save reloads (or redraws) the calendar with its Close button
+        if self._wait_for_dom_change(dom_hash):
+            self._wait_ready(CALENDAR_JS)
+        logger.info("Update clicked")
+
+    def _close_calendar(self):
+        """Click Close to exit calendar view and return to invoice view"""
+        logger.info("Clicking Close...")
+        dom_hash = self._dom_hash()
+        self._js_click("Close")
+        if self._wait_for_dom_change(dom_hash):
+            self._wait_ready(INVOICE_VIEW_JS)
+        logger.info("Close clicked")
+
+    def _capture_then_update(self, uci: str, save: bool = True) -> Tuple[dict, bool]:
+        """
+        capture_portal_billing_data() then click_update(save), with the
+        summary read and the Update click made in one page call.
+        Returns (billing data, whether Update and Close went through).
+        """
+        try:
+            time.sleep(1)  # Wait for values to populate after entering units
+            self._screenshot("13_capture_billing_data")
+            out = self.page.evaluate("save => window.__dds.summaryThenUpdate(save)", save)
+        except Exception as e:
+            logger.error(f"Error capturing billing data: {e}")
+            return self._billing_data(None), self.click_update(save)
+
+        portal_data = self._billing_data(out['summary'])
+        try:
+            if save:
+                self._await_update(out['hash'])
+            else:
+                logger.info("No new units entered, skipping Update")
+            self._close_calendar()
+            return portal_data, True
+        except Exception as e:
+            logger.error(f"Update failed: {e}")
+            return portal_data, False
+
     def capture_portal_billing_data(self, uci: str) -> dict:
         """
         Capture billing data from the calendar page's Invoice Line Summary section.
@@ -2087,80 +2106,109 @@ class DDSeBillingBot:
             self._screenshot("13_capture_billing_data")
 
             # Scrape from Invoice Line Summary section on calendar page
-            billing_data = self.page.evaluate('''() => {
-                let units = 0, rate = 0, gross = 0, net = 0;
-
-                // Get all text content to find values by labels
-                const pageText = document.body.innerText;
-
-                // Extract Unit Rate (shown as text like "118.940")
-                const rateMatch = pageText.match(/Unit Rate[:\\s]+([\\d.]+)/i);
-                if (rateMatch) rate = parseFloat(rateMatch[1]) || 0;
-
-                // Find all input fields on the page
-                const inputs = document.querySelectorAll('input');
-                for (const input of inputs) {
-                    const name = (input.name || '').toLowerCase();
-                    const id = (input.id || '').toLowerCase();
-                    const val = parseFloat((input.value || '0').replace(/[$,]/g, '')) || 0;
-
-                    // Total Units input
-                    if (name.includes('totalunit') || id.includes('totalunit') ||
-                        name.includes('total_unit') || id.includes('total_unit')) {
-                        if (val > 0) units = val;
-                    }
-                    // Gross Amount input
-                    if (name.includes('gross') || id.includes('gross')) {
-                        if (val > 0) gross = val;
-                    }
-                    // Net Amount input
-                    if (name.includes('net') || id.includes('net')) {
-                        if (val > 0) net = val;
-                    }
-                }
+            return self._billing_data(self.page.evaluate("() => window.__dds.lineSummary()"))
 
-                // Alternative: Look for labeled fields in table structure
-                const tds = document.querySelectorAll('td');
-                for (let i = 0; i < tds.length; i++) {
-                    const text = tds[i].innerText.trim();
-                    const nextTd = tds[i + 1];
-                    if (!nextTd) continue;
-
-                    // Check for input in next cell or text value
-                    const nextInput = nextTd.querySelector('input');
-                    const val = nextInput ?
-                        parseFloat((nextInput.value || '0').replace(/[$,]/g, '')) || 0 :
-                        parseFloat(nextTd.innerText.replace(/[$,]/g, '')) || 0;
-
-                    if (text.includes('Total Units') && val > 0) units = val;
-                    if (text.includes('Unit Rate') && val > 0) rate = val;
-                    if (text.includes('Gross Amount') && val > 0) gross = val;
-                    if (text.includes('Net Amount') && val > 0) net = val;
-                }
-
-                return { units_billed: units, unit_rate: rate, gross_amount: gross, net_amount: net };
-            }''')
+        except Exception as e:
+            logger.error(f"Error capturing billing data: {e}")
+            return self._billing_data(None)
+
+    @staticmethod
+    def _billing_data(billing_data: Optional[dict]) -> dict:
+        """Result of capture_portal_billing_data() from __dds.lineSummary() output"""
+        if billing_data:
+            units = billing_data.get('units_billed', 0)
+            rate = billing_data.get('unit_rate', 0)
+            gross = billing_data.get('gross_amount', 0)
+            net = billing_data.get('net_amount', 0)
+
+            logger.info(f"Captured: Units={units}, Rate={rate}, Gross={gross}, Net={net}")
+            return {
+                'units_billed': units,
+                'gross_amount': gross,
+                'net_amount': net,
+                'unit_rate': rate
+            }
+        logger.warning("Could not capture billing data from calendar")
+        return {'units_billed': 0, 'gross_amount': 0, 'net_amount': 0, 'unit_rate': 0}
 
-            if billing_data:
-                units = billing_data.get('units_billed', 0)
-                rate = billing_data.get('unit_rate', 0)
-                gross = billing_data.get('gross_amount', 0)
-                net = billing_data.get('net_amount', 0)
+    def _peek_invoice_line(self, record: Dict) -> Optional[Tuple[float, int]]:
+        """
+        (Units Billed, Days Attend) shown on the record's line of the open
+        invoice view (Line#, Consumer, UCI#, SVC Code, SVC Subcode, Auth#,
+        Auth Date, Unit Type, Units Billed, Days Attend, ...). None unless
+        exactly one line matches its UCI, subcode and auth number - one
+        consumer and month can have several lines differing only by Auth#.
+        """
+        uci = record.get('uci', '')
+        svc_subcode = record.get('svc_subcode', '')
+        auth_number = str(record.get('auth_number', '') or '').strip()
+        matches = []
+        for row in self._snapshot_rows():
+            cells = row['cells']
+            line_idx = next((i for i in range(min(len(cells), 3)) if _LINE_NUMBER_RE.match(cells[i])), -1)
+            if line_idx == -1 or len(cells) <= line_idx + 9 or cells[line_idx + 2] != uci:
+                continue
+            if svc_subcode and cells[line_idx + 4] != svc_subcode:
+                continue
+            if auth_number and cells[line_idx + 5] != auth_number:
+                continue
+            matches.append((cells, line_idx))
+        if len(matches) != 1:
+            return None
+        cells, line_idx = matches[0]
+        try:
+            return float(cells[line_idx + 8].replace(',', '')), int(cells[line_idx + 9])
+        except ValueError:
+            return None
 
-                logger.info(f"Captured: Units={units}, Rate={rate}, Gross={gross}, Net={net}")
-                return {
-                    'units_billed': units,
-                    'gross_amount': gross,
-                    'net_amount': net,
-                    'unit_rate': rate
-                }
-            else:
-                logger.warning("Could not capture billing data from calendar")
-                return {'units_billed': 0, 'gross_amount': 0, 'net_amount': 0, 'unit_rate': 0}
+    def _already_billed(self, record: Dict) -> Optional[SubmissionResult]:
+        """
+        Skipped result, without touching the calendar, if the record's line
+        on the open invoice already shows its CSV units over as many days
+        as the CSV lists, else None
+        """
+        invoice_units, invoice_amount = _invoice_totals(record)
+        service_days = record.get('service_days', [])
+        if invoice_units <= 0 or not service_days:
+            return None
+        line = self._peek_invoice_line(record)
+        if line is None:
+            return None
+        portal_units, portal_days = line
+        if abs(portal_units - invoice_units) > 0.005 or portal_days != len(service_days):
+            return None
+        logger.info(f"⊘ Already billed: {record.get('consumer_name', '')} "
+                    f"({portal_units:g} units over {portal_days} days on portal)")
+        # Only the day count is known, not which days - so no days are
+        # reported as entered, and the calendar (the only place amounts are
+        # read) stays closed
+        return SubmissionResult(
+            success=False,
+            skipped=True,
+            note=(f"Already billed on portal: {portal_units:g} units over {portal_days} days "
+                  f"(days and RC amounts not checked)"),
+            consumer_name=record.get('consumer_name', ''),
+            uci=record.get('uci', ''),
+            invoice_id=self._invoice_id_for(record),
+            days_expected=len(service_days),
+            rc_units_billed=portal_units,
+            invoice_units=invoice_units,
+            invoice_amount=invoice_amount
+        )
 
-        except Exception as e:
-            logger.error(f"Error capturing billing data: {e}")
-            return {'units_billed': 0, 'gross_amount': 0, 'net_amount': 0, 'unit_rate': 0}
+    def _invoice_id_for(self, record: Dict) -> str:
+        """Portal invoice number of the open invoice holding record, '' if unknown"""
+        if self._open_invoice_id:
+            return self._open_invoice_id
+        uci, svc_code = record.get('uci', ''), record.get('svc_code', '')
+        month = _normalize_month(record.get('service_month', ''))
+        for inv in self._invoice_search_cache:
+            if (inv.get('uci') == uci and inv.get('svc_code') == svc_code
+                    and _normalize_month(inv.get('svc_month', '')) == month):
+                return inv.get('invoice_id', '')
+        # Multi-consumer invoice (empty UCI in the search results)
+        match = self._invoice_index.get((svc_code, month))
+        return match.get('invoice_id', '') if match and not match.get('has_uci', True) else ''
 
     def submit_billing_record(self, record: Dict) -> SubmissionResult:
         """
@@ -2190,33 +2238,22 @@ class DDSeBillingBot:
             service_month = record.get('service_month', '')  # MM/YYYY format (e.g., "08/2025")
             service_days = record.get('service_days', [])
             # Get CSV invoice billing data
-            invoice_units = float(record.get('entered_units', 0) or 0)
-            invoice_amount = float(record.get('entered_amount', 0) or 0)
+            invoice_units, invoice_amount = _invoice_totals(record)
 
             logger.info(f"Processing: {consumer_name} (UCI: {uci}, SVC: {svc_code}, Month: {service_month})")
 
             # Open invoice details - match by UCI + Service Code + Service M/Y
             if not self.open_invoice_details(lastname, service_month_year=service_month, uci=uci, svc_code=svc_code):
-                return SubmissionResult(
-                    success=False,
-                    consumer_name=consumer_name,
-                    uci=uci,
-                    error_message="Could not open invoice details",
-                    invoice_units=invoice_units,
-                    invoice_amount=invoice_amount
-                )
+                return _fail_result(record, "Could not open invoice details")
+
+            # Nothing to enter if the line already carries the CSV's units
+            already_billed = self._already_billed(record)
+            if already_billed:
+                return already_billed
 
             # Open calendar
             if not self.open_calendar(uci, svc_code, svc_subcode, service_month):
-                return SubmissionResult(
-                    success=False,
-                    consumer_name=consumer_name,
-                    uci=uci,
-                    days_expected=len(service_days),
-                    error_message="Could not open calendar",
-                    invoice_units=invoice_units,
-                    invoice_amount=invoice_amount
-                )
+                return _fail_result(record, "Could not open calendar")
 
             # Enter service days
             days_entered, unavailable_days, already_entered_days = self.enter_calendar_units(service_days)
@@ -2228,23 +2265,16 @@ class DDSeBillingBot:
             is_partial = effective_days > 0 and effective_days < days_expected
             is_success = effective_days == days_expected and days_expected > 0
 
-            # Capture billing data from calendar's Invoice Line Summary (before Update)
-            portal_data = self.capture_portal_billing_data(uci)
-
-            # Click Update
-            if not self.click_update():
-                return SubmissionResult(
-                    success=False,
+            # Capture billing data from calendar's Invoice Line Summary, then
+            # click Update (just Close if no day was newly entered)
+            portal_data, updated = self._capture_then_update(uci, save=days_entered > 0)
+            if not updated:
+                return _fail_result(
+                    record, "Could not click Update",
                     partial=is_partial,
-                    consumer_name=consumer_name,
-                    uci=uci,
                     days_entered=days_entered,
-                    days_expected=days_expected,
                     unavailable_days=unavailable_days,
-                    already_entered_days=already_entered_days,
-                    error_message="Could not click Update",
-                    invoice_units=invoice_units,
-                    invoice_amount=invoice_amount
+                    already_entered_days=already_entered_days
                 )
 
             # Determine error message based on outcome
@@ -2281,15 +2311,7 @@ class DDSeBillingBot:
 
         except Exception as e:
             logger.error(f"Submission error: {e}")
-            return SubmissionResult(
-                success=False,
-                consumer_name=record.get('consumer_name', ''),
-                uci=record.get('uci', ''),
-                days_expected=len(record.get('service_days', [])),
-                error_message=str(e),
-                invoice_units=float(record.get('entered_units', 0) or 0),
-                invoice_amount=float(record.get('entered_amount', 0) or 0)
-            )
+            return _fail_result(record, str(e))
 
     def submit_billing_record_in_open_invoice(self, record: Dict) -> SubmissionResult:
         """
@@ -2307,22 +2329,17 @@ class DDSeBillingBot:
             service_month = record.get('service_month', '')
             svc_month_year = record.get('svc_month_year', '')
             service_days = record.get('service_days', [])
-            invoice_units = float(record.get('entered_units', 0) or 0)
-            invoice_amount = float(record.get('entered_amount', 0) or 0)
+            invoice_units, invoice_amount = _invoice_totals(record)
 
             logger.info(f"Processing (in-invoice): {consumer_name} (UCI: {uci})")
 
+            already_billed = self._already_billed(record)
+            if already_billed:
+                return already_billed
+
             # Open calendar directly - invoice is already open
             if not self.open_calendar(uci, svc_code, svc_subcode, service_month):
-                return SubmissionResult(
-                    success=False,
-                    consumer_name=consumer_name,
-                    uci=uci,
-                    days_expected=len(service_days),
-                    error_message="Could not open calendar (invoice already open)",
-                    invoice_units=invoice_units,
-                    invoice_amount=invoice_amount
-                )
+                return _fail_result(record, "Could not open calendar (invoice already open)")
 
             # Enter service days
             days_entered, unavailable_days, already_entered_days = self.enter_calendar_units(service_days)
@@ -2334,23 +2351,16 @@ class DDSeBillingBot:
             is_partial = effective_days > 0 and effective_days < days_expected
             is_success = effective_days == days_expected and days_expected > 0
 
-            # Capture billing data
-            portal_data = self.capture_portal_billing_data(uci)
-
-            # Click Update - returns to invoice view
-            if not self.click_update():
-                return SubmissionResult(
-                    success=False,
+            # Capture billing data, then click Update - returns to invoice view
+            # (just Close if no day was newly entered)
+            portal_data, updated = self._capture_then_update(uci, save=days_entered > 0)
+            if not updated:
+                return _fail_result(
+                    record, "Could not click Update",
                     partial=is_partial,
-                    consumer_name=consumer_name,
-                    uci=uci,
                     days_entered=days_entered,
-                    days_expected=days_expected,
                     unavailable_days=unavailable_days,
-                    already_entered_days=already_entered_days,
-                    error_message="Could not click Update",
-                    invoice_units=invoice_units,
-                    invoice_amount=invoice_amount
+                    already_entered_days=already_entered_days
                 )
 
             # Determine error message based on outcome
@@ -2387,74 +2397,125 @@ class DDSeBillingBot:
 
         except Exception as e:
             logger.error(f"In-invoice submission error: {e}")
-            return SubmissionResult(
-                success=False,
-                consumer_name=record.get('consumer_name', ''),
-                uci=record.get('uci', ''),
-                days_expected=len(record.get('service_days', [])),
-                error_message=str(e),
-                invoice_units=float(record.get('entered_units', 0) or 0),
-                invoice_amount=float(record.get('entered_amount', 0) or 0)
-            )
+            return _fail_result(record, str(e))
 
     def _group_records_by_invoice(self, records: List[Dict]) -> Dict[tuple, List[Dict]]:
         """
         Group billing records by invoice key (svc_code, service_month).
         Records with the same key belong to the same invoice.
 
-        Returns: Dict mapping (svc_code, service_month) -> [list of records]
+        Returns: Dict mapping (svc_code, service_month) -> [list of records],
+        ordered by key so a run always visits invoices in the same order
         """
-        grouped = defaultdict(list)
+        def invoice_key(record):
+            return record.get('svc_code', ''), record.get('service_month', '')  # MM/YYYY format
+
         for record in records:
-            svc_code = record.get('svc_code', '')
-            service_month = record.get('service_month', '')  # MM/YYYY format
-            invoice_key = (svc_code, service_month)
-            grouped[invoice_key].append(record)
+            _invoice_totals(record)  # Parsed once here for every later result
+        # Stable sort: records keep their CSV order within a group
+        grouped = {key: list(group) for key, group in groupby(sorted(records, key=invoice_key), key=invoice_key)}
 
         logger.info(f"Grouped {len(records)} records into {len(grouped)} invoice groups")
         for key, recs in grouped.items():
             logger.info(f"  Invoice SVC={key[0]}, Month={key[1]}: {len(recs)} records")
 
-        return dict(grouped)
+        return grouped
 
-    def submit_all_records(self, records: List[Dict], provider_name: str = None) -> List[SubmissionResult]:
+    def _merge_duplicate_records(self, records: List[Dict]) -> List[Dict]:
         """
-        Submit all billing records with inventory-first approach.
-        First scrapes all available invoices from portal, matches CSV records against inventory,
-        then only processes records that have matching invoices.
+        Collapse CSV rows for the same invoice line (uci, svc_code,
+        svc_subcode, auth_number, service_month) so each line's calendar is
+        opened once. Exact repeats (same service days) are dropped; rows
+        with disjoint days are merged, days unioned and units/amounts
+        summed. Rows whose days partly overlap are left as they are.
+        """
+        position = {}  # key -> index in result of the first row for that line
+        result = []
+        for record in records:
+            key = (record.get('uci', ''), record.get('svc_code', ''), record.get('svc_subcode', ''),
+                   record.get('auth_number', ''), record.get('service_month', ''))
+            days = set(record.get('service_days', []))
+            if key not in position:
+                position[key] = len(result)
+                result.append(record)
+                continue
+            first = result[position[key]]
+            first_days = set(first.get('service_days', []))
+            if days == first_days:
+                logger.info(f"Dropping duplicate CSV row: {record.get('consumer_name', '')} (UCI: {key[0]})")
+            elif days.isdisjoint(first_days):
+                combined = dict(first,
+                                service_days=sorted(first_days | days),
+                                entered_units=float(first.get('entered_units', 0) or 0) + float(record.get('entered_units', 0) or 0),
+                                entered_amount=float(first.get('entered_amount', 0) or 0) + float(record.get('entered_amount', 0) or 0))
+                result[position[key]] = combined
+                logger.info(f"Merged CSV rows: {record.get('consumer_name', '')} (UCI: {key[0]}) "
+                            f"-> {len(combined['service_days'])} days")
+            else:
+                result.append(record)
+        return result
 
-        Args:
-            records: List of billing record dictionaries
-            provider_name: Name of the service provider (if None, uses spn_id from first record)
+    def _prepare_submission(self, records: List[Dict], provider_name: str = None
+                            ) -> Tuple[List[SubmissionResult], Dict[tuple, List[Dict]]]:
+        """
+        Phases 1-2 of submit_all_records(): log in, select the provider,
+        build the invoice inventory and match the records against it.
 
-        Returns:
-            List of SubmissionResult objects (includes skipped records with SKIPPED: prefix in error_message)
+        Returns (results so far - failures and SKIPPED records, matchable
+        records grouped by invoice key); the groups are empty if there is
+        nothing to process.
         """
         results = []
 
         # Login
         if not self.login():
-            return [SubmissionResult(success=False, error_message="Login failed")]
+            return [SubmissionResult(success=False, error_message="Login failed")], {}
 
         # Get provider from first record's spn_id if not specified
         if not provider_name and records:
             provider_name = records[0].get('spn_id', '')
         if not provider_name:
-            return [SubmissionResult(success=False, error_message="No provider specified")]
+            return [SubmissionResult(success=False, error_message="No provider specified")], {}
 
         # Select provider
         if not self.select_provider(provider_name):
-            return [SubmissionResult(success=False, error_message=f"Provider selection failed: {provider_name}")]
+            return [SubmissionResult(success=False, error_message=f"Provider selection failed: {provider_name}")], {}
 
         # Navigate to invoices and search
         if not self.navigate_to_invoices():
-            return [SubmissionResult(success=False, error_message="Navigation failed")]
+            return [SubmissionResult(success=False, error_message="Navigation failed")], {}
+
+        records = self._merge_duplicate_records(records)
+
+        # Skip records an interrupted earlier run already submitted
+        self._checkpoint_path = self._checkpoint_file(provider_name)
+        resumed = self._load_checkpoint()
+        if resumed:
+            pending = []
+            for record in records:
+                entry = resumed.get(_checkpoint_key(record))
+                if entry:
+                    results.append(SubmissionResult(**entry))
+                else:
+                    pending.append(record)
+            logger.info(f"Resuming: {len(records) - len(pending)} records already submitted by an interrupted run")
+            records = pending
+            if not records:
+                return results, {}
 
         # === INVENTORY-FIRST PHASE ===
         logger.info("=" * 60)
         logger.info("=== PHASE 1: Building Invoice Inventory ===")
         logger.info("=" * 60)
-        self._invoice_search_cache = self.scrape_all_invoice_pages()
+        inventory = self._load_inventory(provider_name)
+        left_first_page = False
+        if inventory is not None:
+            logger.info(f"Reusing inventory scraped within the last {INVENTORY_CACHE_TTL}s")
+        else:
+            inventory = self.scrape_all_invoice_pages()
+            left_first_page = self._search_page > 1
+            self._save_inventory(provider_name, inventory)
+        self._set_inventory(inventory)
         logger.info(f"Inventory complete: {len(self._invoice_search_cache)} invoices available on portal")
 
         # === MATCHING PHASE ===
@@ -2465,137 +2526,242 @@ class DDSeBillingBot:
         logger.info(f"Match results: {len(matchable_records)} matchable, {len(unmatched_records)} will be skipped")
 
         # Create skip results for unmatched records
-        for record in unmatched_records:
-            results.append(SubmissionResult(
-                success=False,
-                consumer_name=record.get('consumer_name', ''),
-                uci=record.get('uci', ''),
-                error_message=f"SKIPPED: {record.get('skip_reason', 'No matching invoice on portal')}",
-                invoice_units=float(record.get('entered_units', 0) or 0),
-                invoice_amount=float(record.get('entered_amount', 0) or 0)
-            ))
+        results.extend([_fail_result(record, f"SKIPPED: {record.get('skip_reason', 'No matching invoice on portal')}")
+                        for record in unmatched_records])
 
         if not matchable_records:
             logger.warning("No records matched any invoices in inventory - nothing to process")
-            return results
+            return results, {}
 
         # === PROCESSING PHASE ===
         logger.info("=" * 60)
         logger.info(f"=== PHASE 3: Processing {len(matchable_records)} Matched Records ===")
         logger.info("=" * 60)
 
-        # Navigate back to search results (may have changed due to pagination)
-        self.navigate_to_invoices()
+        # Back to the first page of search results if the scrape paged away from it
+        if left_first_page:
+            self.navigate_to_invoices()
 
         # Group matchable records by invoice key for efficient batch processing
         grouped_records = self._group_records_by_invoice(matchable_records)
+        return results, grouped_records
 
-        # Process each invoice group
-        for invoice_key, invoice_records in grouped_records.items():
-            svc_code, service_month = invoice_key
-            logger.info(f"=== Processing invoice group: SVC={svc_code}, Month={service_month} ({len(invoice_records)} records) ===")
-
-            # Track if this is the first record in the invoice
-            is_first_record = True
-            invoice_opened_successfully = False
-
-            for record in invoice_records:
-                if is_first_record:
-                    # First record: Open invoice from search, then process
-                    result = self.submit_billing_record(record)
-                    is_first_record = False
-                    invoice_opened_successfully = result.success or 'Could not open invoice' not in (result.error_message or '')
-
-                    # After first record, cache multi-consumer contents if applicable
-                    if invoice_opened_successfully:
-                        # Check if this is a multi-consumer invoice (empty UCI in search results)
-                        normalized_month = self._normalize_month(service_month)
-                        search_match = next(
-                            (inv for inv in self._invoice_search_cache
-                             if inv.get('svc_code') == svc_code and self._normalize_month(inv.get('svc_month', '')) == normalized_month),
-                            None
-                        )
-                        if search_match and not search_match.get('has_uci', True):
-                            # This is a multi-consumer invoice - cache contents for efficiency
-                            self.cache_multi_consumer_invoice_contents(svc_code, service_month, invoice_id=search_match.get('invoice_id', ''))
-                else:
-                    # Subsequent records: Invoice is already open, skip navigation
-                    if invoice_opened_successfully:
-                        result = self.submit_billing_record_in_open_invoice(record)
-                    else:
-                        # Invoice failed to open on first attempt, skip remaining records in group
-                        result = SubmissionResult(
-                            success=False,
-                            consumer_name=record.get('consumer_name', ''),
-                            uci=record.get('uci', ''),
-                            error_message="Skipped - invoice failed to open",
-                            invoice_units=float(record.get('entered_units', 0) or 0),
-                            invoice_amount=float(record.get('entered_amount', 0) or 0)
-                        )
-
-                results.append(result)
-
-                if result.success:
-                    logger.info(f"✓ Submitted: {result.consumer_name} ({result.days_entered} days)")
+    def submit_invoice_group(self, invoice_key: tuple, invoice_records: List[Dict]) -> List[SubmissionResult]:
+        """
+        Submit the records of one invoice (svc_code, service_month), starting
+        from the search results and returning to them afterwards. The first
+        record opens the invoice; the rest reuse it.
+        """
+        results = []
+        svc_code, service_month = invoice_key
+        logger.info(f"=== Processing invoice group: SVC={svc_code}, Month={service_month} ({len(invoice_records)} records) ===")
+
+        # Track if this is the first record in the invoice
+        is_first_record = True
+        invoice_opened_successfully = False
+
+        for record in invoice_records:
+            if is_first_record:
+                # First record: Open invoice from search, then process
+                result = self.submit_billing_record(record)
+                is_first_record = False
+                invoice_opened_successfully = result.success or 'Could not open invoice' not in (result.error_message or '')
+
+                # After first record, cache multi-consumer contents if applicable
+                if invoice_opened_successfully:
+                    # Check if this is a multi-consumer invoice (empty UCI in search results)
+                    search_match = self._invoice_index.get((svc_code, _normalize_month(service_month)))
+                    if search_match and not search_match.get('has_uci', True):
+                        # This is a multi-consumer invoice - cache contents for efficiency
+                        self.cache_multi_consumer_invoice_contents(svc_code, service_month, invoice_id=search_match.get('invoice_id', ''))
+            else:
+                # Subsequent records: Invoice is already open, skip navigation
+                if invoice_opened_successfully:
+                    result = self.submit_billing_record_in_open_invoice(record)
                 else:
-                    logger.error(f"✗ Failed: {result.consumer_name} - {result.error_message}")
+                    # Invoice failed to open on first attempt, skip remaining records in group
+                    result = _fail_result(record, "Skipped - invoice failed to open")
 
-            # After processing all records in this invoice, navigate back to search
-            logger.info(f"=== Finished invoice group: SVC={svc_code}, Month={service_month} ===")
-            try:
-                # Click Invoices tab
-                logger.info("Navigating back to Invoices tab...")
-                self.page.click('a:has-text("Invoices")', timeout=3000)
-                self.page.wait_for_load_state("networkidle")
-                time.sleep(1)
+            results.append(result)
+            self._checkpoint(record, result)
 
-                # Click Search button - try multiple methods for reliability
-                logger.info("Clicking Search to refresh results...")
-                search_clicked = False
+            if result.success:
+                logger.info(f"✓ Submitted: {result.consumer_name} ({result.days_entered} days)")
+            elif result.skipped:
+                logger.info(f"⊘ Skipped: {result.consumer_name} - {result.note}")
+            else:
+                logger.error(f"✗ Failed: {result.consumer_name} - {result.error_message}")
 
-                # Method 1: Direct button selector
-                try:
-                    self.page.click('button:has-text("Search")', timeout=2000)
-                    search_clicked = True
-                    logger.info("Search clicked via button selector")
-                except:
-                    pass
+        # After processing all records in this invoice, navigate back to search
+        logger.info(f"=== Finished invoice group: SVC={svc_code}, Month={service_month} ===")
+        logger.info("Navigating back to Invoices tab...")
+        if not self.navigate_to_invoices():
+            logger.warning("Failed to navigate back to search")
 
-                # Method 2: Input button
-                if not search_clicked:
-                    try:
-                        self.page.click('input[value="Search"]', timeout=2000)
-                        search_clicked = True
-                        logger.info("Search clicked via input selector")
-                    except:
-                        pass
+        # Clear current invoice tracking
+        self._current_invoice_key = None
+        self._open_invoice_id = None
 
-                # Method 3: JavaScript fallback
-                if not search_clicked:
-                    self._js_click("Search")
-                    logger.info("Search clicked via JavaScript")
+        return results
 
-                self.page.wait_for_load_state("networkidle")
-                time.sleep(2)
-                self._screenshot("14_back_to_search")
+    def submit_all_records(self, records: List[Dict], provider_name: str = None) -> List[SubmissionResult]:
+        """
+        Submit all billing records with inventory-first approach.
+        First scrapes all available invoices from portal, matches CSV records against inventory,
+        then only processes records that have matching invoices.
 
-            except Exception as e:
-                logger.warning(f"Failed to navigate back to search: {e}")
+        Args:
+            records: List of billing record dictionaries
+            provider_name: Name of the service provider (if None, uses spn_id from first record)
+
+        Returns:
+            List of SubmissionResult objects (includes skipped records with SKIPPED: prefix in error_message)
+        """
+        results, grouped_records = self._prepare_submission(records, provider_name)
 
-            # Clear current invoice tracking
-            self._current_invoice_key = None
+        # Process each invoice group
+        for invoice_key, invoice_records in grouped_records.items():
+            results.extend(self.submit_invoice_group(invoice_key, invoice_records))
 
         # Clear caches at end of session
-        self._invoice_search_cache = []
-        self._multi_consumer_cache = {}
+        self._clear_checkpoint()
+        self._set_inventory([])
+        self._multi_consumer_cache.clear()
+        self._invoice_aliases.clear()
 
         return results
 
 
+class DDSeBillingPool:
+    """
+    Submit several providers' records in parallel, one bot session per provider.
+
+    Playwright's sync API is bound to the thread that started it, so each
+    worker thread runs its own DDSeBillingBot (own Playwright + browser)
+    rather than sharing one browser between threads. Each job gets its own
+    screenshot subdirectory.
+
+    submit_records() applies the same model to one provider: its invoice
+    groups go on a shared queue that several sessions drain, so no two
+    sessions ever edit the same invoice.
+
+    All workers log in with the same portal account at the same time; keep
+    n_workers low if the portal limits concurrent sessions per login. Pool
+    sessions always log in fresh, never resuming a saved session
+    (REUSE_PORTAL_SESSION), so each has a portal session of its own.
+    """
+
+    def __init__(self, username: str, password: str, n_workers: int = None,
+                 regional_center: str = 'ELARC', portal_url: str = None,
+                 headless: bool = None):
+        self.username = username
+        self.password = password
+        self.n_workers = n_workers or PLAYWRIGHT_WORKERS
+        self.regional_center = regional_center
+        self.portal_url = portal_url
+        self.headless = headless
+
+    def _bot(self, name: str) -> DDSeBillingBot:
+        safe_name = ''.join(c if c.isalnum() else '_' for c in name or 'default')
+        return DDSeBillingBot(self.username, self.password, headless=self.headless,
+                              regional_center=self.regional_center, portal_url=self.portal_url,
+                              screenshot_dir=os.path.join(SCREENSHOT_DIR, safe_name),
+                              reuse_session=False)
+
+    def _run(self, provider_name: str, records: List[Dict]) -> List[SubmissionResult]:
+        with self._bot(provider_name) as bot:
+            return bot.submit_all_records(records, provider_name)
+
+    def submit_many(self, jobs: Dict[str, List[Dict]]) -> Dict[str, List[SubmissionResult]]:
+        """
+        Submit records for several providers.
+
+        Args:
+            jobs: Mapping of provider SPN ID -> billing records for that provider
+
+        Returns:
+            Mapping of provider SPN ID -> SubmissionResult list
+        """
+        if not jobs:
+            return {}
+        workers = min(self.n_workers, len(jobs))
+        logger.info(f"Submitting {len(jobs)} providers with {workers} parallel sessions")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {spn: executor.submit(self._run, spn, records)
+                       for spn, records in jobs.items()}
+            return {spn: future.result() for spn, future in futures.items()}
+
+    @staticmethod
+    def _drain(bot: DDSeBillingBot, jobs: queue.Queue, done: Dict[int, List[SubmissionResult]]):
+        """Submit invoice groups from jobs until it is empty; results go to done[index]"""
+        while True:
+            try:
+                index, (invoice_key, invoice_records) = jobs.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                done[index] = bot.submit_invoice_group(invoice_key, invoice_records)
+            except Exception as e:
+                logger.error(f"Invoice group {invoice_key} failed: {e}")
+                done[index] = [_fail_result(record, str(e)) for record in invoice_records]
+
+    def _helper(self, index: int, provider_name: str, inventory: List[Dict],
+                jobs: queue.Queue, done: Dict[int, List[SubmissionResult]]):
+        """Extra session for submit_records(): log in, then drain the queue"""
+        try:
+            with self._bot(f"{provider_name}_{index}") as bot:
+                if not (bot.login() and bot.select_provider(provider_name) and bot.navigate_to_invoices()):
+                    logger.warning(f"Session {index} could not reach the invoice search; leaving its share to the others")
+                    return
+                bot._set_inventory(inventory)  # Read-only, shared with the lead session
+                bot._checkpoint_path = bot._checkpoint_file(provider_name)
+                self._drain(bot, jobs, done)
+        except Exception as e:
+            # Groups this session never took stay queued for the others
+            logger.error(f"Session {index} failed: {e}")
+
+    def submit_records(self, records: List[Dict], provider_name: str = None) -> List[SubmissionResult]:
+        """
+        Submit one provider's records across parallel sessions.
+
+        A lead session builds the invoice inventory and matches the records
+        (as submit_all_records() does). It and up to n_workers - 1 more
+        sessions then take invoice groups off a shared queue, so a slow
+        invoice never holds up the rest. Results come back in the same
+        order as submit_all_records() returns them.
+        """
+        if not provider_name and records:
+            provider_name = records[0].get('spn_id', '')
+        with self._bot(provider_name) as lead:
+            results, grouped = lead._prepare_submission(records, provider_name)
+            workers = min(self.n_workers, len(grouped))
+            jobs = queue.Queue()
+            for job in enumerate(grouped.items()):
+                jobs.put(job)
+            done: Dict[int, List[SubmissionResult]] = {}
+            if workers > 1:
+                logger.info(f"Submitting {len(grouped)} invoices for {provider_name} "
+                            f"with {workers} parallel sessions")
+                with ThreadPoolExecutor(max_workers=workers - 1) as executor:
+                    helpers = [executor.submit(self._helper, i, provider_name,
+                                               lead._invoice_search_cache, jobs, done)
+                               for i in range(1, workers)]
+                    self._drain(lead, jobs, done)
+                    for helper in helpers:
+                        helper.result()
+            else:
+                self._drain(lead, jobs, done)
+            for index in sorted(done):
+                results.extend(done[index])
+            lead._clear_checkpoint()
+            return results
+
+
 def submit_to_ebilling(records: List[Dict], username: str, password: str,
                        provider_name: str = None,
                        regional_center: str = "ELARC",
-                       portal_url: str = None) -> List[SubmissionResult]:
+                       portal_url: str = None,
+                       n_workers: int = 1) -> List[SubmissionResult]:
     """
     Convenience function to submit billing records.
 
@@ -2606,10 +2772,16 @@ def submit_to_ebilling(records: List[Dict], username: str, password: str,
         provider_name: Service provider name (if None, uses spn_id from first record)
         regional_center: Regional center code (ELARC, SGPRC, etc.)
         portal_url: Direct URL to the eBilling portal login page
+        n_workers: Parallel browser sessions, each handling whole invoices
+            (see DDSeBillingPool.submit_records)
 
     Returns:
         List of SubmissionResult objects
     """
+    if n_workers > 1:
+        pool = DDSeBillingPool(username, password, n_workers=n_workers,
+                               regional_center=regional_center, portal_url=portal_url)
+        return pool.submit_records(records, provider_name)
     with DDSeBillingBot(username, password, headless=None,
                         regional_center=regional_center, portal_url=portal_url) as bot:
         return bot.submit_all_records(records, provider_name)
@@ -2747,14 +2919,87 @@ def get_portal_providers(username: str, password: str,
         return result
 
 
+def _scan_provider(bot: DDSeBillingBot, prov: Dict) -> Optional[List[Dict]]:
+    """Invoices for one provider, tagged with it; None if its invoices could not be opened"""
+    spn_id = prov['spn_id']
+    logger.info(f"Scanning provider {spn_id} ({prov['name']})...")
+
+    if not bot.select_provider(spn_id):
+        logger.warning(f"Could not select provider {spn_id}, skipping")
+        return None
+
+    if not bot.navigate_to_invoices():
+        logger.warning(f"Could not navigate to invoices for {spn_id}, skipping")
+        return None
+
+    # Scrape search results (includes both single-consumer and folder rows)
+    search_results = bot.scrape_all_invoice_pages()
+    logger.info(f"  Search results: {len(search_results)} invoice rows for {spn_id}")
+
+    expanded_invoices = []
+    for inv in search_results:
+        # ALL invoices may contain multiple SVC subcode lines inside
+        folder_invoices = bot.expand_multi_consumer_folder(inv)
+        expanded_invoices.extend(folder_invoices)
+        bot.navigate_to_invoices()
+
+    # Tag each invoice with provider info
+    for inv in expanded_invoices:
+        inv['provider_spn'] = spn_id
+        inv['provider_name'] = prov['name']
+    logger.info(f"  Found {len(expanded_invoices)} invoices for {spn_id}")
+    return expanded_invoices
+
+
+def _drain_providers(bot: DDSeBillingBot, jobs: queue.Queue, done: Dict[int, List[Dict]]):
+    """Scan providers from jobs until it is empty; invoices go to done[index]"""
+    while True:
+        try:
+            index, prov = jobs.get_nowait()
+        except queue.Empty:
+            return
+        done[index] = _scan_provider(bot, prov) or []
+        if jobs.empty():
+            return
+
+        # Navigate back to provider selection for next provider
+        if not bot.navigate_to_provider_selection():
+            logger.warning(f"Failed to navigate back after {prov['spn_id']}, retrying...")
+            # Retry once — click Home then Dashboard
+            time.sleep(2)
+            if not bot.navigate_to_provider_selection():
+                logger.error(f"Cannot navigate back to provider selection after {prov['spn_id']}")
+                return
+
+
+def _provider_scan_helper(pool: DDSeBillingPool, index: int, jobs: queue.Queue,
+                          done: Dict[int, List[Dict]]):
+    """Extra session for scrape_all_providers_inventory(): log in, then drain the queue"""
+    try:
+        # pool._bot() never resumes the saved session, so this is a portal
+        # session of its own
+        with pool._bot(f"scan_{index}") as bot:
+            if not bot.login():
+                logger.warning(f"Scan session {index} could not log in; leaving its share to the others")
+                return
+            _drain_providers(bot, jobs, done)
+    except Exception as e:
+        logger.error(f"Scan session {index} failed: {e}")
+
+
 def scrape_all_providers_inventory(username: str, password: str,
                                    regional_center: str = "ELARC",
-                                   portal_url: str = None) -> Dict:
+                                   portal_url: str = None,
+                                   n_workers: int = 1) -> Dict:
     """
     Scan all providers on an RC login and return combined invoice inventory.
 
-    Uses a single login session to iterate through all providers, avoiding
-    multiple logins that trigger portal session conflicts.
+    By default one login session iterates through all providers, avoiding
+    multiple logins that trigger portal session conflicts. With
+    n_workers > 1, up to n_workers - 1 extra sessions take providers off a
+    shared queue alongside it. Each of them logs in fresh and never resumes
+    the saved session (REUSE_PORTAL_SESSION), since sessions sharing its
+    cookies would select providers under each other.
 
     Returns:
         Dict with keys:
@@ -2781,53 +3026,29 @@ def scrape_all_providers_inventory(username: str, password: str,
                 'message': 'No providers found on the RC portal for this login.'
             }
 
+        jobs = queue.Queue()
+        for job in enumerate(providers):
+            jobs.put(job)
+        done: Dict[int, List[Dict]] = {}
+        workers = min(n_workers, len(providers))
+        if workers > 1:
+            logger.info(f"Scanning {len(providers)} providers with {workers} parallel sessions")
+            pool = DDSeBillingPool(username, password, n_workers=workers,
+                                   regional_center=regional_center, portal_url=portal_url)
+            with ThreadPoolExecutor(max_workers=workers - 1) as executor:
+                helpers = [executor.submit(_provider_scan_helper, pool, i, jobs, done)
+                           for i in range(1, workers)]
+                _drain_providers(bot, jobs, done)
+                for helper in helpers:
+                    helper.result()
+        else:
+            _drain_providers(bot, jobs, done)
+
         all_invoices = []
         providers_scanned = []
-
-        for i, prov in enumerate(providers):
-            spn_id = prov['spn_id']
-            logger.info(f"Scanning provider {spn_id} ({prov['name']})...")
-
-            if not bot.select_provider(spn_id):
-                logger.warning(f"Could not select provider {spn_id}, skipping")
-                providers_scanned.append(prov)
-                bot.navigate_to_provider_selection()
-                continue
-
-            if not bot.navigate_to_invoices():
-                logger.warning(f"Could not navigate to invoices for {spn_id}, skipping")
-                providers_scanned.append(prov)
-                bot.navigate_to_provider_selection()
-                continue
-
-            # Scrape search results (includes both single-consumer and folder rows)
-            search_results = bot.scrape_all_invoice_pages()
-            logger.info(f"  Search results: {len(search_results)} invoice rows for {spn_id}")
-
-            expanded_invoices = []
-            for inv in search_results:
-                # ALL invoices may contain multiple SVC subcode lines inside
-                folder_invoices = bot.expand_multi_consumer_folder(inv)
-                expanded_invoices.extend(folder_invoices)
-                bot.navigate_to_invoices()
-
-            # Tag each invoice with provider info
-            for inv in expanded_invoices:
-                inv['provider_spn'] = spn_id
-                inv['provider_name'] = prov['name']
-            all_invoices.extend(expanded_invoices)
-            providers_scanned.append(prov)
-            logger.info(f"  Found {len(expanded_invoices)} invoices for {spn_id}")
-
-            # Navigate back to provider selection for next provider
-            if i < len(providers) - 1:
-                if not bot.navigate_to_provider_selection():
-                    logger.warning(f"Failed to navigate back after {spn_id}, retrying...")
-                    # Retry once — click Home then Dashboard
-                    time.sleep(2)
-                    if not bot.navigate_to_provider_selection():
-                        logger.error(f"Cannot navigate back to provider selection after {spn_id}")
-                        break
+        for index in sorted(done):
+            all_invoices.extend(done[index])
+            providers_scanned.append(providers[index])
 
     logger.info(f"All-providers scan complete: {len(all_invoices)} total invoices from {len(providers_scanned)} providers")
     result = {
@@ -3051,8 +3272,35 @@ def scrape_all_providers_inventory_fast(username: str, password: str,
     return result
 
 
+# <input ...> attribute parsing for the portal's server-rendered forms
+_INPUT_TAG_RE = re.compile(r'<input\s+([^>]*)/?>', re.IGNORECASE)
+_INPUT_NAME_RE = re.compile(r'name=["\']([^"\']*)["\']')
+_INPUT_VALUE_RE = re.compile(r'value=["\']([^"\']*)["\']')
+_INPUT_VALUE_BARE_RE = re.compile(r'value=(\S+)')  # Unquoted, e.g. value=3
+_DAY_FIELD_RE = re.compile(r'^C(\d+)$')  # Calendar day inputs C1-C31
+_INVOICE_ID_RE = re.compile(r'^\d{7}$')  # Invoice numbers in the search results
+_LINE_NUMBER_RE = re.compile(r'^\d{1,3}$')  # Line# column of an invoice view
+_HAS_LETTER_RE = re.compile(r'[a-zA-Z]')
+
+# (svc_code, svc_month) of a scraped inventory item in one C-level call
+_INV_CODE_MONTH = itemgetter('svc_code', 'svc_month')
+
+
+def _parse_input_fields(html: str) -> Dict[str, str]:
+    """Map every named <input> in the HTML to its value ('' if none)"""
+    fields = {}
+    for input_match in _INPUT_TAG_RE.finditer(html):
+        attrs_str = input_match.group(1)
+        name_m = _INPUT_NAME_RE.search(attrs_str)
+        if name_m:
+            value_m = _INPUT_VALUE_RE.search(attrs_str) or _INPUT_VALUE_BARE_RE.search(attrs_str)
+            fields[name_m.group(1)] = value_m.group(1) if value_m else ''
+    return fields
+
+
+@lru_cache(maxsize=512)
 def _normalize_month(month_str: str) -> str:
-    """Normalize month format: '8/2025' -> '08/2025'"""
+    """Normalize month format: '8/2025' -> '08/2025' (cached; months repeat heavily)"""
     if not month_str:
         return ''
     parts = month_str.split('/')
@@ -3061,6 +3309,24 @@ def _normalize_month(month_str: str) -> str:
     return month_str
 
 
+@lru_cache(maxsize=512)
+def _month_key(month_str: str):
+    """
+    Hashable matching key for a month: '8/2025' and '08/2025' -> (2025, 8).
+    Strings that are not M/YYYY are returned as-is, so they only match
+    themselves (as _normalize_month does).
+    """
+    if not month_str:
+        return ''
+    parts = month_str.split('/')
+    if len(parts) == 2:
+        try:
+            return int(parts[1]), int(parts[0])
+        except ValueError:
+            pass
+    return month_str
+
+
 def submit_to_ebilling_fast(records: List[Dict], username: str, password: str,
                             provider_name: str = None,
                             regional_center: str = "ELARC",
@@ -3085,7 +3351,6 @@ def submit_to_ebilling_fast(records: List[Dict], username: str, password: str,
         List of SubmissionResult objects
     """
     import requests as req
-    import re
 
     results = []
 
@@ -3236,17 +3501,15 @@ def submit_to_ebilling_fast(records: List[Dict], username: str, password: str,
         logger.info("=== PHASE 2: Matching Records to Inventory ===")
         logger.info("=" * 60)
 
-        # Build lookup structures
+        # Build lookup structures (one pass)
         inventory_by_key = defaultdict(list)
-        for inv in inventory:
-            key = (inv['svc_code'], _normalize_month(inv['svc_month']))
-            inventory_by_key[key].append(inv)
-
         inventory_by_uci = {}
         for inv in inventory:
+            inv_code, inv_month = _INV_CODE_MONTH(inv)
+            month = _month_key(inv_month)
+            inventory_by_key[(inv_code, month)].append(inv)
             uci = inv.get('uci', '')
             if uci:
-                month = _normalize_month(inv['svc_month'])
                 inventory_by_uci[(uci, month)] = inv
 
         matchable_records = []
@@ -3254,12 +3517,12 @@ def submit_to_ebilling_fast(records: List[Dict], username: str, password: str,
 
         for record in records:
             svc_code = record.get('svc_code', '')
-            service_month = _normalize_month(record.get('service_month', ''))
+            month = _month_key(record.get('service_month', ''))
             uci = record.get('uci', '')
             consumer_name = record.get('consumer_name', '')
 
             # Method 1: Direct UCI + month match
-            matched_inv = inventory_by_uci.get((uci, service_month))
+            matched_inv = inventory_by_uci.get((uci, month))
             if matched_inv:
                 record['_matched_inv'] = matched_inv
                 matchable_records.append(record)
@@ -3267,8 +3530,9 @@ def submit_to_ebilling_fast(records: List[Dict], username: str, password: str,
                 continue
 
             # Method 2: Check by service code + month
-            key = (svc_code, service_month)
+            key = (svc_code, month)
             matching_invoices = inventory_by_key.get(key, [])
+            service_month = _normalize_month(record.get('service_month', ''))  # for messages
 
             if not matching_invoices:
                 record['skip_reason'] = f"No invoice found for SVC {svc_code}, Month {service_month}"
@@ -3291,15 +3555,8 @@ def submit_to_ebilling_fast(records: List[Dict], username: str, password: str,
         logger.info(f"Match results: {len(matchable_records)} matchable, {len(unmatched_records)} skipped")
 
         # Create skip results for unmatched records
-        for record in unmatched_records:
-            results.append(SubmissionResult(
-                success=False,
-                consumer_name=record.get('consumer_name', ''),
-                uci=record.get('uci', ''),
-                error_message=f"SKIPPED: {record.get('skip_reason', 'No matching invoice')}",
-                invoice_units=float(record.get('entered_units', 0) or 0),
-                invoice_amount=float(record.get('entered_amount', 0) or 0)
-            ))
+        results.extend([_fail_result(record, f"SKIPPED: {record.get('skip_reason', 'No matching invoice')}")
+                        for record in unmatched_records])
 
         if not matchable_records:
             logger.warning("No records matched — nothing to process")
@@ -3314,8 +3571,7 @@ def submit_to_ebilling_fast(records: List[Dict], username: str, password: str,
             uci = record.get('uci', '')
             consumer_name = record.get('consumer_name', '')
             service_days = record.get('service_days', [])
-            invoice_units = float(record.get('entered_units', 0) or 0)
-            invoice_amount = float(record.get('entered_amount', 0) or 0)
+            invoice_units, invoice_amount = _invoice_totals(record)
             matched_inv = record.get('_matched_inv', {})
             invoice_internal_id = matched_inv.get('invoice_internal_id', '')
             consumer_line_id = matched_inv.get('consumer_line_id', '')
@@ -3358,20 +3614,8 @@ def submit_to_ebilling_fast(records: List[Dict], username: str, password: str,
                 # The calendar form (unitcalendarForm) uses Dojo widgets.
                 # Day inputs are named C1-C31, with hidden W1-W31 and ABSENCETYPES1-31.
                 # We need to include ALL inputs in the POST, not just changed ones.
-                form_data = {}
-
                 # Extract ALL input fields (hidden + text) generically
-                for input_match in re.finditer(r'<input\s+([^>]*)/?>', calendar_html, re.IGNORECASE):
-                    attrs_str = input_match.group(1)
-                    name_m = re.search(r'name=["\']([^"\']*)["\']', attrs_str)
-                    value_m = re.search(r'value=["\']([^"\']*)["\']', attrs_str)
-                    # Also handle unquoted value like value=3
-                    if not value_m:
-                        value_m = re.search(r'value=(\S+)', attrs_str)
-                    if name_m:
-                        name = name_m.group(1)
-                        value = value_m.group(1) if value_m else ''
-                        form_data[name] = value
+                form_data = _parse_input_fields(calendar_html)
 
                 logger.info(f"  Extracted {len(form_data)} form fields from calendar HTML")
 
@@ -3545,16 +3789,7 @@ def submit_to_ebilling_fast(records: List[Dict], username: str, password: str,
 
             except Exception as e:
                 logger.error(f"  Error submitting {consumer_name}: {e}")
-                results.append(SubmissionResult(
-                    success=False,
-                    consumer_name=consumer_name,
-                    uci=uci,
-                    invoice_id=invoice_id,
-                    days_expected=len(service_days),
-                    error_message=str(e),
-                    invoice_units=invoice_units,
-                    invoice_amount=invoice_amount
-                ))
+                results.append(_fail_result(record, str(e), invoice_id=invoice_id))
 
     except req.RequestException as e:
         logger.error(f"Fast submit HTTP error: {e}")
@@ -3578,28 +3813,17 @@ def capture_calendar_values(calendar_html: str) -> Dict[int, float]:
     Returns:
         Dict mapping day number (1-31) to current unit value
     """
-    import re
     day_values = {}
 
-    # Extract ALL input fields
-    for input_match in re.finditer(r'<input\s+([^>]*)/?>', calendar_html, re.IGNORECASE):
-        attrs_str = input_match.group(1)
-        name_m = re.search(r'name=["\']([^"\']*)["\']', attrs_str)
-        value_m = re.search(r'value=["\']([^"\']*)["\']', attrs_str)
-        if not value_m:
-            value_m = re.search(r'value=(\S+)', attrs_str)
-
-        if name_m:
-            name = name_m.group(1)
-            # Check if it's a day field (C1-C31)
-            if re.match(r'^C(\d+)$', name):
-                day_num = int(name[1:])
-                if 1 <= day_num <= 31:
-                    value = value_m.group(1) if value_m else ''
-                    try:
-                        day_values[day_num] = float(value) if value.strip() else 0.0
-                    except ValueError:
-                        day_values[day_num] = 0.0
+    for name, value in _parse_input_fields(calendar_html).items():
+        # Check if it's a day field (C1-C31)
+        if _DAY_FIELD_RE.match(name):
+            day_num = int(name[1:])
+            if 1 <= day_num <= 31:
+                try:
+                    day_values[day_num] = float(value) if value.strip() else 0.0
+                except ValueError:
+                    day_values[day_num] = 0.0
 
     return day_values
 
@@ -3707,7 +3931,6 @@ def submit_fm_invoice_fast(
         List of FMUploadResult objects
     """
     import requests as req
-    import re
 
     results = []
 
@@ -3926,17 +4149,7 @@ def submit_fm_invoice_fast(
                     logger.info(f"    Captured existing values: {len(days_with_values)} days with values, total={original_total}")
 
                     # Step 3: Extract ALL form fields
-                    form_data = {}
-                    for input_match in re.finditer(r'<input\s+([^>]*)/?>', calendar_html, re.IGNORECASE):
-                        attrs_str = input_match.group(1)
-                        name_m = re.search(r'name=["\']([^"\']*)["\']', attrs_str)
-                        value_m = re.search(r'value=["\']([^"\']*)["\']', attrs_str)
-                        if not value_m:
-                            value_m = re.search(r'value=(\S+)', attrs_str)
-                        if name_m:
-                            name = name_m.group(1)
-                            value = value_m.group(1) if value_m else ''
-                            form_data[name] = value
+                    form_data = _parse_input_fields(calendar_html)
 
                     # Get unit rate from page
                     rate_match = re.search(r'monthlyrate\s*=\s*([0-9.]+)', calendar_html)
@@ -3995,17 +4208,7 @@ def submit_fm_invoice_fast(
                         calendar_html = resp.text
 
                         # Re-extract form fields
-                        form_data = {}
-                        for input_match in re.finditer(r'<input\s+([^>]*)/?>', calendar_html, re.IGNORECASE):
-                            attrs_str = input_match.group(1)
-                            name_m = re.search(r'name=["\']([^"\']*)["\']', attrs_str)
-                            value_m = re.search(r'value=["\']([^"\']*)["\']', attrs_str)
-                            if not value_m:
-                                value_m = re.search(r'value=(\S+)', attrs_str)
-                            if name_m:
-                                name = name_m.group(1)
-                                value = value_m.group(1) if value_m else ''
-                                form_data[name] = value
+                        form_data = _parse_input_fields(calendar_html)
 
                         # Step 6: ENTER FM values
                         for day in service_days:
@@ -0,0 +1,525 @@
+/*
+ * Page helpers for the DDS eBilling bot.
+ *
+ * Installed into every page of the bot's browser context with
+ * context.add_init_script(), so the bot calls small parameterized
+ * functions (page.evaluate("t => window.__dds.clickByText(t)", text))
+ * instead of shipping and re-parsing a script on every action.
+ *
+ *   clickByText(text)          click the first input/button/a/span/td whose
+ *                              text is exactly `text`
+ *   clickAny(specs)            specs = [[css, text|null], ...]; click the first
+ *                              visible element matching the first spec that
+ *                              has one (text = case-insensitive substring);
+ *                              returns the matching spec's css, or null
+ *   tryNav(label, ms, link)    click a nav item (exact text, or with link=true
+ *                              the first <a> containing label) and resolve
+ *                              true once Service Provider Selection shows,
+ *                              false after ms
+ *   findProviderByIdent(ident) click a provider row by SPN ID or name;
+ *                              returns the strategy that matched, or null
+ *   openInvoice(args)          click EDIT on an invoice search-results row;
+ *                              args = {invoiceId, uci, svc, month}; returns
+ *                              {method, detail} or null (see below)
+ *   readProviderGrid()         {providers: [{spn_id, name}], diag} from the
+ *                              provider table; diag describes the grid
+ *   domVersion()               changes whenever the DOM's structure or text
+ *                              does (per document); attribute-only changes
+ *                              such as hover/focus classes leave it alone
+ *   snapshotRows(known)        {version, rows: [{index, cells: [text]}]} for
+ *                              every <tr> with 6+ cells, or null if the DOM
+ *                              is still at version `known`
+ *   clickRowCell(index, from, to, fallback)
+ *                              click the first link in cells from..to-1 of
+ *                              <tr> number `index`, else cell `fallback`
+ *   indexCalendar()            stamp each calendar day cell with data-cal-day;
+ *                              returns the day numbers found
+ *   enterCalendarUnits(args)   args = {days, units}; fill the stamped day
+ *                              inputs, returning {day: status}
+ *   lineSummary()              {units_billed, unit_rate, gross_amount,
+ *                              net_amount} from the calendar's Invoice Line
+ *                              Summary (0 where not found)
+ *   summaryThenUpdate(save)    {summary: lineSummary(), hash: domHash()},
+ *                              then clicks Update if save - one round trip
+ *                              for the end of a calendar entry
+ *   domHash()                  fingerprint of the page's controls
+ *   signals()                  post-login page state
+ *
+ * The action-label index and signals are cached and marked stale by a
+ * MutationObserver, so reads after an unchanged DOM cost nothing. The same
+ * observer drives domVersion(), which lets the bot reuse a row snapshot.
+ */
+(() => {
+    const ACTIONS = ['OK', 'Close', 'Logout', 'Accept', 'I Agree', 'ACCEPT', 'Update', 'Login', 'Search'];
+    const CLICKABLE = 'input, button, a, span, td';
+    const SPN = /^[A-Za-z]{2}\d+$/;
+    const textOf = (el) => (el.value || el.innerText || '').trim();
+
+    let actions = null;
+    let signals = null;
+    const clicks = new Map();
+    const docId = Math.random().toString(36).slice(2);
+    let mutations = 0;  // childList/characterData only: what snapshotRows() reads
+    new MutationObserver((records) => {
+        actions = null;
+        signals = null;
+        if (records.some(r => r.type !== 'attributes')) mutations++;
+    }).observe(document, {
+        childList: true, subtree: true, characterData: true, attributes: true,
+    });
+
+    const actionIndex = () => {
+        if (actions) return actions;
+        actions = new Map();
+        const wanted = new Set(ACTIONS);
+        for (const el of document.querySelectorAll(CLICKABLE)) {
+            const t = textOf(el);
+            if (wanted.has(t) && !actions.has(t)) {
+                actions.set(t, el);
+                if (actions.size === wanted.size) break;
+            }
+        }
+        return actions;
+    };
+
+    const clickByText = (text) => {
+        let el;
+        if (ACTIONS.includes(text)) {
+            el = actionIndex().get(text);
+        } else {
+            // Remember the element per text; re-validate before reuse
+            el = clicks.get(text);
+            if (!el || !el.isConnected || textOf(el) !== text) {
+                el = null;
+                for (const cand of document.querySelectorAll(CLICKABLE)) {
+                    if (textOf(cand) === text) { el = cand; break; }
+                }
+                if (el) clicks.set(text, el); else clicks.delete(text);
+            }
+        }
+        if (!el) return false;
+        el.click();
+        return true;
+    };
+
+    const clickAny = (specs) => {
+        for (const [css, text] of specs) {
+            const needle = text ? text.toLowerCase() : null;
+            for (const el of document.querySelectorAll(css)) {
+                if (el.offsetParent === null) continue;
+                if (needle && !(el.innerText || '').toLowerCase().includes(needle)) continue;
+                el.click();
+                return css;
+            }
+        }
+        return null;
+    };
+
+    const tryNav = (label, timeoutMs, link) => {
+        if (link) {
+            const a = Array.from(document.getElementsByTagName('a'))
+                .find(el => (el.innerText || '').includes(label));
+            if (!a) return Promise.resolve(false);
+            a.click();
+        } else if (!clickByText(label)) {
+            return Promise.resolve(false);
+        }
+        const deadline = performance.now() + timeoutMs;
+        return new Promise(resolve => {
+            const poll = () => {
+                if (readSignals().provider) resolve(true);
+                else if (performance.now() > deadline) resolve(false);
+                else requestAnimationFrame(poll);
+            };
+            requestAnimationFrame(poll);
+        });
+    };
+
+    // Strategies in priority order:
+    //   exact   - exact SPN ID match on a grid cell
+    //   numeric - numeric portion of the SPN ID (HP1829 vs PP1829)
+    //   name    - provider name substring (case-insensitive)
+    //   td      - plain <td> layout, by text or SPN number
+    const findProviderByIdent = (ident) => {
+        const upper = ident.toUpperCase();
+        const lower = ident.toLowerCase();
+        const numeric = ident.replace(/\D/g, '');
+        const numericRe = numeric ? new RegExp('[A-Za-z]+' + numeric + '$', 'i') : null;
+        const clickRow = (el, rowSel) => {
+            const row = el.closest(rowSel);
+            (row || el).click();
+        };
+
+        const cells = Array.from(document.querySelectorAll('.dojoxGridCell'));
+        const texts = cells.map(c => (c.innerText || '').trim());
+        let i = texts.findIndex(t => t.toUpperCase() === upper);
+        if (i >= 0) { clickRow(cells[i], '.dojoxGridRow'); return 'exact'; }
+        if (numericRe) {
+            i = texts.findIndex(t => numericRe.test(t));
+            if (i >= 0) { clickRow(cells[i], '.dojoxGridRow'); return 'numeric'; }
+        }
+        i = texts.findIndex(t => t.toLowerCase().includes(lower));
+        if (i >= 0) { clickRow(cells[i], '.dojoxGridRow'); return 'name'; }
+
+        const tds = Array.from(document.querySelectorAll('td'));
+        const tdTexts = tds.map(td => (td.innerText || '').trim());
+        const letterless = ident.replace(/[A-Za-z]/g, '');
+        for (let j = 0; j < tds.length; j++) {
+            const t = tdTexts[j];
+            if (t.toUpperCase() === upper || t.toLowerCase().includes(lower)) {
+                const row = tds[j].closest('tr');
+                if (row) { row.click(); return 'td'; }
+            }
+        }
+        for (let j = 0; j < tds.length; j++) {
+            const t = tdTexts[j];
+            if (SPN.test(t) && t.replace(/[A-Za-z]/g, '') === letterless) {
+                const row = tds[j].closest('tr');
+                if (row) { row.click(); return 'td'; }
+            }
+        }
+        return null;
+    };
+
+    // Invoice search results: [0]Checkbox, [1]Invoice#, [2]Service Code,
+    // [3]Service M/Y, [4]UCI#, [5]Consumer Name, ... One scan over the rows
+    // collects candidates for every method, then they are tried in priority
+    // order:
+    //   invoice - invoice number (most precise; used by folder expansion)
+    //   dojo    - invoice number in a Dojo DataGrid (rows split across views)
+    //   direct  - UCI + service code + service M/Y (single-consumer invoice)
+    //   multi   - no UCI, service code + service M/Y (multi-consumer invoice)
+    const normalizeMonth = (m) => {
+        if (!m) return '';
+        const parts = m.split('/');
+        return parts.length === 2 ? parts[0].padStart(2, '0') + '/' + parts[1] : m;
+    };
+    // Column of the EDIT link, learned from the first row clicked in this
+    // document; later rows look only in that cell, and a miss re-learns it
+    let editCol = -1;
+    const clickEdit = (row, cells) => {
+        let editLink = editCol >= 0 && editCol < cells.length
+            ? cells[editCol].querySelector('a, img') : null;
+        if (!editLink) {
+            editLink = row.querySelector('a[href*="edit"], a img, img[src*="edit"]')
+                || cells[cells.length - 1].querySelector('a, img');
+            if (!editLink) return false;
+            editCol = Array.prototype.indexOf.call(cells, editLink.closest('td'));
+        }
+        editLink.click();
+        return true;
+    };
+    // Row index (within its view) of the Dojo grid row holding the text
+    const DOJO_ROWS = '.dojoxGridContent .dojoxGridRow, .dojoxGridScrollbox .dojoxGridRow';
+    const dojoRowIndex = (text) => {
+        for (const view of document.querySelectorAll('.dojoxGridView')) {
+            const dRows = view.querySelectorAll(DOJO_ROWS);
+            for (let r = 0; r < dRows.length; r++) {
+                for (const cell of dRows[r].getElementsByClassName('dojoxGridCell')) {
+                    if ((cell.textContent || '').trim() === text) return r;
+                }
+            }
+        }
+        return -1;
+    };
+
+    const openInvoice = (args) => {
+        const svc = args.svc || '';
+        const targetMonth = normalizeMonth(args.month);
+        const candidates = { invoice: [], direct: [], multi: [] };
+        const rows = document.getElementsByTagName('tr');
+        for (let i = 0, n = rows.length; i < n; i++) {
+            const row = rows[i];
+            const cells = row.getElementsByTagName('td');
+            if (cells.length < 6) continue;
+            const rowInvoiceId = (cells[1].textContent || '').trim();
+            if (args.invoiceId && rowInvoiceId === args.invoiceId) {
+                candidates.invoice.push([row, cells]);
+            }
+            if (!targetMonth) continue;
+            const rowSvcCode = (cells[2].textContent || '').trim();
+            const rowMonth = normalizeMonth((cells[3].textContent || '').trim());
+            const rowUci = (cells[4].textContent || '').trim();
+            if (rowMonth !== targetMonth || (svc && !rowSvcCode.startsWith(svc))) continue;
+            if (args.uci && rowUci === args.uci) candidates.direct.push([row, cells]);
+            if (!rowUci) candidates.multi.push([row, cells]);
+        }
+
+        for (const [row, cells] of candidates.invoice) {
+            if (clickEdit(row, cells)) return { method: 'invoice', detail: args.invoiceId };
+        }
+        if (args.invoiceId) {
+            const idx = dojoRowIndex(args.invoiceId);
+            if (idx >= 0) {
+                // Find the edit button at this row index in any view
+                for (const view of document.querySelectorAll('.dojoxGridView')) {
+                    const row = view.querySelectorAll(DOJO_ROWS)[idx];
+                    const editImg = row && (row.querySelector('img[src*="edit" i]')
+                        || row.querySelector('a[href*="edit"] img')
+                        || row.querySelector('a img'));
+                    if (editImg) {
+                        editImg.click();
+                        return { method: 'dojo', detail: args.invoiceId + ' at row ' + idx };
+                    }
+                }
+            }
+        }
+        for (const [row, cells] of candidates.direct) {
+            if (clickEdit(row, cells)) return { method: 'direct', detail: 'UCI=' + args.uci + ', Month=' + args.month };
+        }
+        for (const [row, cells] of candidates.multi) {
+            if (clickEdit(row, cells)) return { method: 'multi', detail: 'Month=' + args.month };
+        }
+        return null;
+    };
+
+    // Dojo DataGrid multi-view layout: each column is in a separate "view",
+    // so each .dojoxGridRow contains only 1 cell. Search ALL cells individually;
+    // a provider's name is the same-index row of a sibling view.
+    const readProviderGrid = () => {
+        const results = [];
+        const seen = new Set();
+
+        // Index every view's rows once: row -> [view, index], view -> rows
+        const rowSel = '.dojoxGridContent .dojoxGridRow, .dojoxGridScrollbox .dojoxGridRow';
+        const viewRows = new Map();
+        const rowInfo = new Map();
+        for (const view of document.querySelectorAll('.dojoxGridView')) {
+            const rows = Array.from(view.querySelectorAll(rowSel));
+            viewRows.set(view, rows);
+            rows.forEach((row, i) => rowInfo.set(row, [view, i]));
+        }
+
+        const cells = document.querySelectorAll('.dojoxGridCell');
+        const diag = {
+            dojoxGridRows: rowInfo.size,
+            dojoxGridCells: cells.length,
+            sampleCells: Array.from(cells).slice(0, 10)
+                .map(c => (c.innerText || '').trim().substring(0, 20)),
+        };
+
+        for (const cell of cells) {
+            const text = (cell.innerText || '').trim();
+            if (SPN.test(text) && !seen.has(text.toUpperCase())) {
+                seen.add(text.toUpperCase());
+                let name = '';
+                const info = rowInfo.get(cell.closest('.dojoxGridRow'));
+                if (info) {
+                    const [view, rowIdx] = info;
+                    for (const v of view.parentElement ? view.parentElement.children : []) {
+                        if (v === view || !viewRows.has(v)) continue;
+                        const other = viewRows.get(v)[rowIdx];
+                        if (other) {
+                            const otherText = (other.innerText || '').trim();
+                            if (otherText && !SPN.test(otherText)) {
+                                name = otherText;
+                            }
+                        }
+                    }
+                }
+                results.push({ spn_id: text.toUpperCase(), name: name });
+            }
+        }
+        // Fallback: try plain td cells if dojoxGridCell returned nothing
+        if (results.length === 0) {
+            for (const td of document.querySelectorAll('td')) {
+                const text = (td.innerText || '').trim();
+                if (SPN.test(text) && !seen.has(text.toUpperCase())) {
+                    seen.add(text.toUpperCase());
+                    // Get description from next sibling td
+                    const nextTd = td.nextElementSibling;
+                    const name = nextTd ? (nextTd.innerText || '').trim() : '';
+                    results.push({ spn_id: text.toUpperCase(), name: name });
+                }
+            }
+        }
+        return { providers: results, diag: diag };
+    };
+
+    const domVersion = () => docId + ':' + mutations;
+
+    // Text of every cell (whitespace collapsed, via textContent so no layout
+    // is forced) of every row wide enough to be a data row. `index` is the
+    // row's position in getElementsByTagName('tr') for clickRowCell().
+    const snapshotRows = (known) => {
+        const version = domVersion();
+        if (known === version) return null;
+        const rows = [];
+        const trs = document.getElementsByTagName('tr');
+        for (let i = 0; i < trs.length; i++) {
+            const tds = trs[i].getElementsByTagName('td');
+            if (tds.length < 6) continue;
+            const cells = new Array(tds.length);
+            for (let c = 0; c < tds.length; c++) {
+                cells[c] = (tds[c].textContent || '').replace(/\s+/g, ' ').trim();
+            }
+            rows.push({ index: i, cells: cells });
+        }
+        return { version: version, rows: rows };
+    };
+
+    const clickRowCell = (index, from, to, fallback) => {
+        const row = document.getElementsByTagName('tr')[index];
+        if (!row) return null;
+        const tds = row.getElementsByTagName('td');
+        for (let c = from; c < Math.min(tds.length, to); c++) {
+            const link = tds[c].querySelector('a');
+            if (link) { link.click(); return 'clicked link in column ' + c; }
+        }
+        if (tds[fallback]) { tds[fallback].click(); return 'clicked cell ' + fallback; }
+        return null;
+    };
+
+    // A calendar cell's day label is its first non-blank text node
+    const firstText = (cell) => {
+        const walker = document.createTreeWalker(cell, NodeFilter.SHOW_TEXT);
+        for (let n = walker.nextNode(); n; n = walker.nextNode()) {
+            const t = n.nodeValue.trim();
+            if (t) return t;
+        }
+        return '';
+    };
+
+    // Stamp each day's cell with data-cal-day once per calendar page so
+    // later writes are a single attribute lookup instead of a td walk.
+    // Returns the day numbers found.
+    const indexCalendar = () => {
+        for (const el of document.querySelectorAll('td[data-cal-day]')) {
+            delete el.dataset.calDay;
+        }
+        const days = [];
+        const seen = new Set();
+        const tds = document.getElementsByTagName('td');
+        for (let i = 0, n = tds.length; i < n; i++) {
+            const cell = tds[i];
+            if (!cell.querySelector('input')) continue;
+            const label = firstText(cell);
+            if (!/^\d{1,2}$/.test(label) || seen.has(label)) continue;
+            seen.add(label);
+            cell.dataset.calDay = label;
+            days.push(parseInt(label, 10));
+        }
+        return days;
+    };
+
+    // Fill every requested day via the data-cal-day stamps. A miss re-indexes
+    // once, in case the portal re-rendered the grid since indexCalendar().
+    // Returns {day: 'success' | 'disabled' | 'already_entered' | 'not_found'}.
+    const enterCalendarUnits = (args) => {
+        const find = (day) => document.querySelector('td[data-cal-day="' + day + '"]');
+        let reindexed = false;
+        const out = {};
+        for (const day of args.days) {
+            let cell = find(day);
+            if (!cell && !reindexed) {
+                indexCalendar();
+                reindexed = true;
+                cell = find(day);
+            }
+            const input = cell && cell.querySelector('input');
+            if (!input) { out[day] = 'not_found'; continue; }
+            const style = getComputedStyle(input);
+            if (input.disabled || input.readOnly ||
+                input.getAttribute('disabled') !== null ||
+                input.getAttribute('readonly') !== null ||
+                cell.classList.contains('disabled') ||
+                style.pointerEvents === 'none' ||
+                parseFloat(style.opacity) < 0.5) {
+                out[day] = 'disabled';
+            } else if ((parseFloat(input.value) || 0) > 0) {
+                // Never overwrite a value already on the portal
+                out[day] = 'already_entered';
+            } else {
+                input.value = String(args.units);
+                input.dispatchEvent(new Event('input', { bubbles: true }));
+                input.dispatchEvent(new Event('change', { bubbles: true }));
+                out[day] = 'success';
+            }
+        }
+        return out;
+    };
+
+    // FNV-1a over the document id and each control's tag, visibility and
+    // leading text - changes when dialogs open/close or the page navigates
+    // (even a reload to identical controls), not on unrelated updates
+    const domHash = () => {
+        let h = 0x811c9dc5;
+        for (let i = 0; i < docId.length; i++) {
+            h ^= docId.charCodeAt(i);
+            h = Math.imul(h, 0x01000193);
+        }
+        for (const el of document.querySelectorAll('button, input, a')) {
+            const s = el.tagName + (el.offsetParent !== null ? '1' : '0') +
+                      textOf(el).slice(0, 16) + '|';
+            for (let i = 0; i < s.length; i++) {
+                h ^= s.charCodeAt(i);
+                h = Math.imul(h, 0x01000193);
+            }
+        }
+        return h >>> 0;
+    };
+
+    // Labeled fields in table structure: a label cell followed by a cell
+    // holding an input or plain text (Unit Rate). Cells wrapping a nested
+    // table are layout, not labels.
+    const lineSummary = () => {
+        let units = 0, rate = 0, gross = 0, net = 0;
+        const tds = document.getElementsByTagName('td');
+        for (let i = 0; i < tds.length - 1; i++) {
+            if (tds[i].getElementsByTagName('td').length) continue;
+            const text = tds[i].textContent.replace(/\s+/g, ' ').trim();
+            const nextTd = tds[i + 1];
+
+            // Check for input in next cell or text value
+            const nextInput = nextTd.querySelector('input');
+            const val = nextInput ?
+                parseFloat((nextInput.value || '0').replace(/[$,]/g, '')) || 0 :
+                parseFloat(nextTd.textContent.replace(/[$,\s]/g, '')) || 0;
+
+            if (text.includes('Total Units') && val > 0) units = val;
+            if (text.includes('Unit Rate') && val > 0) rate = val;
+            if (text.includes('Gross Amount') && val > 0) gross = val;
+            if (text.includes('Net Amount') && val > 0) net = val;
+            if (units && rate && gross && net) break;
+        }
+        return { units_billed: units, unit_rate: rate, gross_amount: gross, net_amount: net };
+    };
+
+    const summaryThenUpdate = (save) => {
+        const out = { summary: lineSummary(), hash: domHash() };
+        if (save) clickByText('Update');
+        return out;
+    };
+
+    const readSignals = () => {
+        if (signals === null) {
+            const text = document.body ? document.body.innerText : '';
+            const expiry = text.match(/password will expire in (\d+) day/);
+            signals = {
+                expiryDays: expiry ? parseInt(expiry[1], 10) : null,
+                agreement: text.includes('I do not agree'),
+                profile: text.includes('User Profile of'),
+                provider: text.includes('Service Provider Selection'),
+            };
+        }
+        return signals;
+    };
+
+    window.__dds = {
+        clickByText,
+        clickAny,
+        tryNav,
+        findProviderByIdent,
+        openInvoice,
+        readProviderGrid,
+        domVersion,
+        snapshotRows,
+        clickRowCell,
+        indexCalendar,
+        enterCalendarUnits,
+        lineSummary,
+        summaryThenUpdate,
+        domHash,
+        signals: readSignals,
+    };
+})();
@@ -1,8 +1,11 @@
 """
 Database models for RCBilling SaaS
 """
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy.orm import validates
+from sqlalchemy.ext.hybrid import hybrid_property
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from cryptography.fernet import Fernet
@@ -53,19 +56,47 @@ class User(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
 
-    providers = db.relationship('Provider', backref='user', lazy='dynamic',
+    # Loaded alongside the user (one extra SELECT ... IN) since the upload and
+    # settings pages always need them
+    providers = db.relationship('Provider', backref='user', lazy='selectin',
+                                order_by='Provider.id',
                                 cascade='all, delete-orphan')
 
+    __table_args__ = (
+        # Login looks users up by LOWER(email); covers rows saved before
+        # emails were normalized. On an existing database, merge or rename
+        # users whose emails differ only in case before creating it:
+        #   SELECT LOWER(email) FROM users GROUP BY 1 HAVING COUNT(*) > 1;
+        db.Index('ix_users_email_lower', db.func.lower(email), unique=True),
+    )
+
+    @validates('email')
+    def _normalize_email(self, key, email):
+        return email.strip().lower() if email else email
+
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        method = current_app.config.get('PASSWORD_HASH_METHOD') if has_app_context() else None
+        if method:
+            self.password_hash = generate_password_hash(password, method=method)
+        else:
+            self.password_hash = generate_password_hash(password)
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
-    @property
+    @hybrid_property
     def is_admin(self):
         return self.role == 'admin'
 
+    @hybrid_property
+    def is_subscription_active(self):
+        # Accounts have no subscription period; access is the is_active flag
+        return bool(self.is_active)
+
+    @is_subscription_active.expression
+    def is_subscription_active(cls):
+        return cls.is_active.is_(True)
+
     def __repr__(self):
         return f'<User {self.email}>'
 
@@ -154,5 +185,10 @@ class SubmissionLog(db.Model):
     user = db.relationship('User', backref=db.backref('submissions', lazy='dynamic'))
     provider = db.relationship('Provider', backref=db.backref('submissions', lazy='dynamic'))
 
+    __table_args__ = (
+        # Per-clinic history: WHERE user_id = ? ORDER BY timestamp DESC LIMIT n
+        db.Index('ix_submissionlog_user_ts', user_id, timestamp.desc()),
+    )
+
     def __repr__(self):
         return f'<SubmissionLog {self.id}>'
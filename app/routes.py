@@ -23,7 +23,7 @@ def allowed_file(filename):
 @main_bp.route('/')
 @login_required
 def index():
-    providers = current_user.providers.order_by(Provider.name).all()
+    providers = sorted(current_user.providers, key=lambda p: p.name)
     return render_template('upload.html', providers=providers)
 
 
@@ -36,7 +36,7 @@ def upload_file():
         flash('Please select a Regional Center', 'error')
         return redirect(url_for('main.index'))
 
-    provider = Provider.query.get(provider_id)
+    provider = db.session.get(Provider, provider_id)
     if not provider or provider.user_id != current_user.id:
         flash('Invalid Regional Center selection', 'error')
         return redirect(url_for('main.index'))
@@ -84,7 +84,7 @@ def submit_claims():
     if not records:
         return jsonify({'status': 'error', 'message': 'No records to submit'})
 
-    provider = Provider.query.get(provider_id) if provider_id else None
+    provider = db.session.get(Provider, provider_id) if provider_id else None
     if not provider or provider.user_id != current_user.id:
         return jsonify({'status': 'error', 'message': 'Regional Center not selected'})
 
@@ -107,7 +107,7 @@ def submit_claims():
         # Count by status category
         success_count = sum(1 for r in results if r.success and not r.partial)
         partial_count = sum(1 for r in results if r.partial)
-        skipped_count = sum(1 for r in results if not r.success and not r.partial and r.error_message and r.error_message.startswith('SKIPPED:'))
+        skipped_count = sum(1 for r in results if not r.success and not r.partial and (r.skipped or (r.error_message and r.error_message.startswith('SKIPPED:'))))
         failed_count = len(results) - success_count - partial_count - skipped_count
 
         # Build lookup for original records by UCI
@@ -117,7 +117,7 @@ def submit_claims():
         for r in results:
             # Find matching original record by UCI
             orig = orig_by_uci.get(r.uci, {})
-            is_skipped = r.error_message and r.error_message.startswith('SKIPPED:')
+            is_skipped = r.skipped or (r.error_message and r.error_message.startswith('SKIPPED:'))
             result_details.append({
                 'consumer_name': r.consumer_name or orig.get('consumer_name', ''),
                 'uci': r.uci or orig.get('uci', ''),
@@ -134,7 +134,7 @@ def submit_claims():
                 'days_entered': r.days_entered,
                 'unavailable_days': r.unavailable_days or [],
                 'already_entered_days': r.already_entered_days or [],
-                'error': r.error_message or '',
+                'error': r.error_message or r.note or '',
                 # Invoice data from CSV (may be empty)
                 'invoice_units': r.invoice_units,
                 'invoice_amount': r.invoice_amount,
@@ -388,7 +388,7 @@ def get_available_invoices():
         flash('Please select a provider', 'error')
         return redirect(url_for('main.index'))
 
-    provider = Provider.query.get(provider_id)
+    provider = db.session.get(Provider, provider_id)
     if not provider or provider.user_id != current_user.id:
         flash('Invalid provider selection', 'error')
         return redirect(url_for('main.index'))
@@ -452,7 +452,7 @@ def get_available_invoices_ajax():
     if not provider_id:
         return jsonify({'status': 'error', 'message': 'Provider not specified'})
 
-    provider = Provider.query.get(provider_id)
+    provider = db.session.get(Provider, provider_id)
     if not provider or provider.user_id != current_user.id:
         return jsonify({'status': 'error', 'message': 'Invalid provider'})
 
@@ -513,7 +513,7 @@ def get_available_invoices_all():
         flash('Please select a provider', 'error')
         return redirect(url_for('main.index'))
 
-    provider = Provider.query.get(provider_id)
+    provider = db.session.get(Provider, provider_id)
     if not provider or provider.user_id != current_user.id:
         flash('Invalid provider selection', 'error')
         return redirect(url_for('main.index'))
@@ -642,7 +642,7 @@ def submit_fm_invoice():
     if not provider_id:
         return jsonify({'status': 'error', 'message': 'No provider selected'})
 
-    provider = Provider.query.get(provider_id)
+    provider = db.session.get(Provider, provider_id)
     if not provider or provider.user_id != current_user.id:
         return jsonify({'status': 'error', 'message': 'Invalid provider'})
 
@@ -748,7 +748,7 @@ def zero_out_fm_entries():
     if not provider_id:
         return jsonify({'status': 'error', 'message': 'No provider selected'})
 
-    provider = Provider.query.get(provider_id)
+    provider = db.session.get(Provider, provider_id)
     if not provider or provider.user_id != current_user.id:
         return jsonify({'status': 'error', 'message': 'Invalid provider'})
 
@@ -0,0 +1,55 @@
+"""
+Test helpers for catching N+1 queries
+
+Usage:
+    with app.app_context(), strict_loading(), count_queries() as queries:
+        client.get('/admin/')
+    assert len(queries) <= 4
+"""
+from contextlib import contextmanager
+from sqlalchemy import event
+from app.models import db
+
+
+class LazyLoadError(AssertionError):
+    """Raised when a relationship is lazy-loaded inside strict_loading()"""
+
+
+@contextmanager
+def strict_loading(session=None):
+    """
+    Raise LazyLoadError whenever a relationship lazy-loads.
+
+    Works like adding raiseload('*') to every query, except relationships
+    configured with an eager strategy (e.g. User.providers, lazy='selectin')
+    still load normally - only loads that would fire from attribute access
+    on an already-loaded object are rejected.
+    """
+    session = session or db.session()
+
+    def _reject_lazy_load(orm_execute_state):
+        parent = orm_execute_state.lazy_loaded_from
+        if parent is not None:
+            raise LazyLoadError(f"Lazy load triggered from {parent.class_.__name__}")
+
+    event.listen(session, 'do_orm_execute', _reject_lazy_load)
+    try:
+        yield session
+    finally:
+        event.remove(session, 'do_orm_execute', _reject_lazy_load)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """Collect every SQL statement executed on the engine into a list"""
+    engine = engine or db.engine
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', _record)
@@ -1,5 +1,7 @@
 import os
+from datetime import timedelta
 from pathlib import Path
+from sqlalchemy.pool import StaticPool
 
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -21,6 +23,27 @@ class Config:
     if SQLALCHEMY_DATABASE_URI.startswith('postgres://'):
         SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI.replace('postgres://', 'postgresql://', 1)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'check_same_thread': False}}
+    else:
+        # Per gunicorn worker; pre_ping/recycle drop connections the server closed
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': 30,
+            'pool_recycle': 1800,
+            'pool_pre_ping': True,
+        }
+    # Run db.create_all() on app startup (dev convenience). In production,
+    # tables and the default admin are created once with `flask init-db`.
+    AUTO_CREATE_TABLES = os.environ.get(
+        'AUTO_CREATE_TABLES',
+        'true' if os.environ.get('FLASK_ENV') == 'development' else 'false'
+    ).lower() == 'true'
+
+    # Blueprints to register (None = all). Tests that only exercise one
+    # area can set e.g. {'auth'} to skip importing the rest.
+    ENABLED_BLUEPRINTS = None
 
     # Encryption key for credentials (generate with: Fernet.generate_key())
     CREDENTIAL_KEY = os.environ.get('CREDENTIAL_KEY') or None
@@ -31,13 +54,47 @@ class Config:
     # Playwright headless mode (default True for production)
     PLAYWRIGHT_HEADLESS = os.environ.get('PLAYWRIGHT_HEADLESS', 'true').lower() == 'true'
 
+    # Werkzeug hash method for User.set_password (None = Werkzeug's default)
+    PASSWORD_HASH_METHOD = None
+
+    # Response cache (admin dashboard). It must be shared by every worker
+    # (gunicorn runs 2), or one keeps serving a page another invalidated:
+    # RedisCache when CACHE_REDIS_URL is set (needs the redis package),
+    # otherwise no caching. Per-process SimpleCache is only safe with a
+    # single worker (CACHE_TYPE=SimpleCache)
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'RedisCache' if CACHE_REDIS_URL else 'NullCache')
+    CACHE_DEFAULT_TIMEOUT = 20
+
     # Session cookie security (HTTPS-only in production)
     SESSION_COOKIE_SECURE = os.environ.get('FLASK_ENV') != 'development'
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
+    # Session contents don't change after login; don't re-sign the cookie
+    # on every response
+    SESSION_REFRESH_EACH_REQUEST = False
+    REMEMBER_COOKIE_DURATION = timedelta(days=30)
+    REMEMBER_COOKIE_REFRESH_EACH_REQUEST = False
+    REMEMBER_COOKIE_SECURE = SESSION_COOKIE_SECURE
+    REMEMBER_COOKIE_HTTPONLY = True
 
     # DDS eBilling portal URLs
     RC_PORTAL_URLS = {
         'SGPRC': 'https://ebilling.dds.ca.gov:8379/login',
         'ELARC': 'https://ebilling.dds.ca.gov:8373/login',
     }
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    # One shared in-memory connection so every session sees the same tables
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    }
+    AUTO_CREATE_TABLES = True
+    # A single PBKDF2 round - the default KDF costs 100s of ms per hash
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1'
+    CACHE_TYPE = 'NullCache'
+    SESSION_COOKIE_SECURE = False
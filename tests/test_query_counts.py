@@ -0,0 +1,73 @@
+"""
+Query-count guards for the pages that render relationships.
+
+strict_loading() makes any lazy load an error and count_queries() caps the
+number of statements, so a template or view change that brings back an
+N+1 fails here rather than in production.
+"""
+import os
+
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+
+import pytest
+from config import TestingConfig
+from app import create_app
+from app.models import db, User, Provider, SubmissionLog
+from app.testing import strict_loading, count_queries
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _user(email, role, name):
+    user = User(email=email, name=name, role=role, is_active=True)
+    user.set_password('password')
+    db.session.add(user)
+    return user
+
+
+def _login(client, user):
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+        sess['_fresh'] = True
+
+
+def test_admin_dashboard_queries(app):
+    admin = _user('admin@example.com', 'admin', 'Administrator')
+    clinics = [_user(f'clinic{i}@example.com', 'clinic', f'Clinic {i}') for i in range(5)]
+    db.session.flush()
+    db.session.add_all(SubmissionLog(user_id=clinic.id, total_records=3, total_services=7)
+                       for clinic in clinics for _ in range(2))
+    db.session.commit()
+
+    client = app.test_client()
+    _login(client, admin)
+    with strict_loading(), count_queries() as queries:
+        response = client.get('/admin/')
+
+    assert response.status_code == 200
+    # User, recent logs, their users (SELECT ... IN), clinics, stats
+    assert len(queries) <= 5
+
+
+def test_settings_queries(app):
+    clinic = _user('clinic@example.com', 'clinic', 'Clinic')
+    db.session.flush()
+    db.session.add_all(Provider(user_id=clinic.id, name=f'Provider {i}', regional_center='ELARC')
+                       for i in range(3))
+    db.session.commit()
+
+    client = app.test_client()
+    _login(client, clinic)
+    with strict_loading(), count_queries() as queries:
+        response = client.get('/auth/settings')
+
+    assert response.status_code == 200
+    # User, then its providers (lazy='selectin')
+    assert len(queries) <= 2